@@ -0,0 +1,169 @@
+"""
+FetenaHub - In-process and shared caches
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after a TTL.
+
+    Entries may carry their own expiry (e.g. an auth_date deadline) which is
+    honoured when it is earlier than the cache-wide TTL.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        now = time.time()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] <= now:
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key, value, expires_at=None):
+        deadline = time.time() + self.ttl
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+        with self._lock:
+            self._data[key] = (deadline, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        return {'size': len(self._data), 'hits': self.hits, 'misses': self.misses}
+
+class SingleFlight:
+    """Lets concurrent callers of the same key share one call's result.
+
+    The first caller runs the function; callers arriving while it is in
+    flight wait for it and get the same result (or exception). Nothing is
+    kept afterwards, so this never serves stale data.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}   # key -> [done event, result, exception]
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = [threading.Event(), None, None]
+                self.calls += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call[0].wait()
+            if call[2] is not None:
+                raise call[2]
+            return call[1]
+
+        try:
+            call[1] = fn()
+            return call[1]
+        except BaseException as e:
+            call[2] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call[0].set()
+
+    def stats(self):
+        return {'calls': self.calls, 'shared': self.shared}
+
+# ============== SHARED CACHE BACKENDS ==============
+
+class MemoryBackend:
+    """Per-process cache backend; coherent only within one instance"""
+    name = 'memory'
+
+    def __init__(self, maxsize=256, ttl=300):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl else None
+        self._cache.set(key, value, expires_at=expires_at)
+
+    def delete(self, key):
+        self._cache.delete(key)
+
+    def generation(self, key):
+        """Counter bumped by every invalidation of `key`"""
+        with self._lock:
+            return self._generations.get(key, 0)
+
+    def bump(self, key):
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+class RedisBackend:
+    """Cache backend on a Redis-compatible server, shared by all instances"""
+    name = 'redis'
+
+    def __init__(self, client, prefix='fetenahub:', ttl=300):
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, json.dumps(value), ex=int(ttl or self.ttl))
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def generation(self, key):
+        """Counter bumped by every invalidation of `key`"""
+        raw = self.client.get(self.prefix + key + ':generation')
+        return int(raw) if raw is not None else 0
+
+    def bump(self, key):
+        self.client.incr(self.prefix + key + ':generation')
+
+def create_cache_backend(url=None, ttl=300):
+    """Redis backend when a redis:// URL is configured, in-memory otherwise"""
+    if url:
+        import redis
+        return RedisBackend(redis.Redis.from_url(url), ttl=ttl)
+    return MemoryBackend(ttl=ttl)
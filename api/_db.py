@@ -0,0 +1,104 @@
+"""
+FetenaHub - Supabase client factory
+
+Owns one Supabase client per process whose PostgREST and Storage calls go
+through a tuned keep-alive HTTP/2 connection pool. Module state survives
+warm Vercel invocations, so TLS handshakes are paid once per connection
+instead of once per request. Pool sizing and timeouts are read
+from the environment and hit/miss counters are available via pool_stats();
+callables in query_observers see every round trip and its duration.
+
+Nothing here imports supabase or httpx: the client is built (by _pool) on
+first use through LazyClient, so cold starts that never reach the database
+don't load that stack.
+"""
+
+import os
+import threading
+
+
+class PoolConfig:
+    """Connection pool settings, overridable through SUPABASE_POOL_* variables"""
+
+    def __init__(self, env=os.environ):
+        self.max_connections = int(env.get('SUPABASE_POOL_SIZE', '20'))
+        self.max_keepalive = int(env.get('SUPABASE_POOL_KEEPALIVE', '10'))
+        self.keepalive_expiry = float(env.get('SUPABASE_POOL_KEEPALIVE_EXPIRY', '60'))
+        self.connect_timeout = float(env.get('SUPABASE_CONNECT_TIMEOUT', '5'))
+        self.timeout = float(env.get('SUPABASE_TIMEOUT', '10'))
+        self.http2 = env.get('SUPABASE_HTTP2', '1') == '1'
+        self.retries = int(env.get('SUPABASE_CONNECT_RETRIES', '1'))
+
+    def limits(self):
+        import httpx
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def timeouts(self):
+        import httpx
+        return httpx.Timeout(self.timeout, connect=self.connect_timeout)
+
+class PoolMetrics:
+    """Counts requests served on a reused connection (hit) or a new one (miss)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def record(self, new_connection=False, error=False):
+        with self._lock:
+            if error:
+                self.errors += 1
+            elif new_connection:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+    def snapshot(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'errors': self.errors,
+                'hit_ratio': round(self.hits / total, 3) if total else None,
+            }
+
+metrics = PoolMetrics()
+
+# Called with (request, seconds) after every Supabase HTTP round trip
+query_observers = []
+
+_lock = threading.Lock()
+_clients = {}
+
+def get_client(url, key):
+    """Process-wide shared client; forked workers get their own pool"""
+    cache_key = (url, key, os.getpid())
+    client = _clients.get(cache_key)
+    if client is None:
+        with _lock:
+            client = _clients.get(cache_key)
+            if client is None:
+                from _pool import create_supabase_client
+                client = create_supabase_client(url, key, PoolConfig())
+                _clients[cache_key] = client
+    return client
+
+class LazyClient:
+    """Stands in for get_client(url, key), creating the client on first attribute access"""
+
+    def __init__(self, url, key):
+        self.url = url
+        self.key = key
+
+    def __getattr__(self, name):
+        return getattr(get_client(self.url, self.key), name)
+
+def pool_stats():
+    return metrics.snapshot()
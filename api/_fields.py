@@ -0,0 +1,120 @@
+"""
+FetenaHub - Sparse field selection for exam lists
+
+Parses a `fields=` parameter such as
+
+    id,year,exam_type,users.username,courses.name,cover.thumbnail_url,files_count,is_liked
+
+into the PostgREST select for the exams query, the columns needed from
+exam_files and whether the like state has to be loaded, then trims each
+hydrated exam to the requested keys. `view=card` is the set of fields the
+feed card renders. Without either, exams are returned in full as before.
+
+Pseudo-fields: `files_count` (number of pages), `cover` (the first page,
+with the same sub-fields as `files`), `is_liked` and `search_rank`.
+"""
+
+
+EXAM_COLUMNS = ('id', 'created_at', 'user_id', 'university_id', 'course_id', 'year', 'exam_type',
+                'teacher_name', 'likes_count', 'trending_score', 'pdf_url')
+
+FILE_COLUMNS = ('id', 'file_url', 'thumbnail_url', 'preview_url', 'page_order')
+
+# Embedded relation -> columns a client may ask for
+RELATIONS = {
+    'users': ('id', 'username', 'avatar_url', 'bio', 'followers_count', 'following_count'),
+    'universities': ('id', 'name'),
+    'courses': ('id', 'name'),
+    'files': FILE_COLUMNS,
+    'cover': FILE_COLUMNS,
+}
+
+COMPUTED = ('is_liked', 'files_count', 'search_rank')
+
+# What ExamCard renders
+VIEWS = {
+    'card': 'id,created_at,user_id,year,exam_type,teacher_name,likes_count,is_liked,'
+            'users.username,users.avatar_url,universities.name,courses.name,'
+            'cover.thumbnail_url,cover.file_url,files_count',
+}
+
+class FieldError(ValueError):
+    pass
+
+class FieldSelection:
+    """A parsed fields= list"""
+
+    def __init__(self, fields):
+        self.scalars = []
+        self.relations = {}
+        for field in fields:
+            name, _, sub = field.partition('.')
+            if sub:
+                if name not in RELATIONS or sub not in RELATIONS[name]:
+                    raise FieldError(f'Unknown field: {field}')
+                self.relations.setdefault(name, [])
+                if sub not in self.relations[name]:
+                    self.relations[name].append(sub)
+            elif name in RELATIONS:
+                self.relations[name] = list(RELATIONS[name])
+            elif name in EXAM_COLUMNS or name in COMPUTED:
+                if name not in self.scalars:
+                    self.scalars.append(name)
+            else:
+                raise FieldError(f'Unknown field: {field}')
+
+    @property
+    def wants_liked(self):
+        return 'is_liked' in self.scalars
+
+    @property
+    def wants_files(self):
+        return 'files' in self.relations or 'cover' in self.relations or 'files_count' in self.scalars
+
+    def exam_select(self, *extra):
+        """Select for the exams query; id, created_at and `extra` are always loaded for paging"""
+        columns = ['id', 'created_at']
+        columns += [c for c in (*extra, *self.scalars) if c in EXAM_COLUMNS and c not in columns]
+        # The inner join on users is kept even when no user field is requested
+        users = self.relations.get('users') or ['id']
+        parts = columns + [f"users!inner({', '.join(users)})"]
+        for name in ('universities', 'courses'):
+            if name in self.relations:
+                parts.append(f"{name}({', '.join(self.relations[name])})")
+        return ', '.join(parts)
+
+    def file_select(self):
+        """Columns needed from exam_files, or None when no page data is requested"""
+        if not self.wants_files:
+            return None
+        columns = ['exam_id', 'page_order']
+        for name in ('files', 'cover'):
+            columns += [c for c in self.relations.get(name, ()) if c not in columns]
+        return ', '.join(columns)
+
+    def project(self, exam):
+        """The requested keys of a hydrated exam"""
+        out = {name: exam.get(name) for name in self.scalars}
+        files = exam.get('files') or []
+        for name, columns in self.relations.items():
+            if name == 'files':
+                out['files'] = [{c: f.get(c) for c in columns} for f in files]
+            elif name == 'cover':
+                out['cover'] = {c: files[0].get(c) for c in columns} if files else None
+            else:
+                related = exam.get(name)
+                out[name] = {c: related.get(c) for c in columns} if related else None
+        return out
+
+def parse_fields(fields=None, view=None):
+    """FieldSelection for a fields= / view= pair, None for full exams.
+
+    Raises FieldError for unknown fields or views.
+    """
+    if view:
+        if view not in VIEWS:
+            raise FieldError(f'Unknown view: {view}')
+        fields = ','.join(filter(None, (VIEWS[view], fields)))
+    if not fields:
+        return None
+    return FieldSelection([f.strip() for f in fields.split(',') if f.strip()])
@@ -0,0 +1,133 @@
+"""
+FetenaHub - Uploaded page processing
+
+Turns an uploaded exam page into the sizes the app actually shows:
+
+* a small WebP thumbnail for feed cards
+* a compressed WebP reading size for the exam viewer
+* optionally, one PDF holding every page of an exam
+
+Derived files are stored in the same bucket under `derived/`, next to the
+original, which is kept untouched for "open original". Image work needs
+Pillow; PDF pages are rendered only when PyMuPDF is installed, otherwise
+they keep their original URL.
+"""
+
+import hashlib
+import io
+import posixpath
+
+
+THUMBNAIL_WIDTH = 320
+THUMBNAIL_QUALITY = 60
+PREVIEW_WIDTH = 1280
+PREVIEW_QUALITY = 75
+
+PUBLIC_PREFIX = '/storage/v1/object/public/'
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def content_sha256(stream, chunk_size=HASH_CHUNK_SIZE):
+    """Hex SHA-256 of a file-like object, read in fixed-size chunks"""
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(chunk_size), b''):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+def stream_object(bucket, path, chunk_size=HASH_CHUNK_SIZE):
+    """Yield a stored object in chunks instead of loading it whole.
+
+    storage3 only offers whole-object downloads, so the same GET is streamed
+    through the bucket's HTTP session; storage stand-ins without one are
+    downloaded in a single piece.
+    """
+    session = getattr(bucket, '_client', None)
+    if session is None or not hasattr(bucket, '_get_final_path'):
+        yield bucket.download(path)
+        return
+    with session.stream('GET', f'object/{bucket._get_final_path(path)}') as response:
+        response.raise_for_status()
+        yield from response.iter_bytes(chunk_size)
+
+def stored_sha256(bucket, path):
+    """(hex SHA-256, size in bytes) of a stored object, hashed as it streams in"""
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in stream_object(bucket, path):
+        digest.update(chunk)
+        size += len(chunk)
+    return digest.hexdigest(), size
+
+def blob_path(sha256, extension):
+    """Content-addressed object path for an upload"""
+    return f'blobs/{sha256[:2]}/{sha256}.{extension}' if extension else f'blobs/{sha256[:2]}/{sha256}'
+
+def storage_path(public_url, bucket):
+    """Object path inside `bucket` for one of its public URLs, or None"""
+    marker = f'{PUBLIC_PREFIX}{bucket}/'
+    if not public_url or marker not in public_url:
+        return None
+    return public_url.split(marker, 1)[1].split('?', 1)[0]
+
+def derived_path(path, kind):
+    stem, _ = posixpath.splitext(path)
+    return f'derived/{stem}.{kind}.webp'
+
+def _open_image(data):
+    from PIL import Image, ImageOps
+
+    if data[:4] == b'%PDF':
+        try:
+            import fitz
+        except ImportError:
+            return None
+        with fitz.open(stream=data, filetype='pdf') as doc:
+            pixmap = doc[0].get_pixmap(dpi=110)
+            data = pixmap.tobytes('png')
+    image = Image.open(io.BytesIO(data))
+    image = ImageOps.exif_transpose(image)
+    return image.convert('RGB')
+
+def _webp(image, width, quality):
+    image = image.copy()
+    if image.width > width:
+        image.thumbnail((width, width * 4))
+    out = io.BytesIO()
+    image.save(out, 'WEBP', quality=quality, method=4)
+    return out.getvalue()
+
+def render_page(data):
+    """Return {'thumbnail': bytes, 'preview': bytes} for one page, or None if it can't be rendered"""
+    image = _open_image(data)
+    if image is None:
+        return None
+    return {
+        'thumbnail': _webp(image, THUMBNAIL_WIDTH, THUMBNAIL_QUALITY),
+        'preview': _webp(image, PREVIEW_WIDTH, PREVIEW_QUALITY),
+    }
+
+def process_upload(bucket, path, data=None):
+    """Render and store the derived sizes of an uploaded page.
+
+    `data` is the page's content when the caller already downloaded it.
+    Returns {'thumbnail_url', 'preview_url'}, or an empty dict when the
+    file type can't be rendered here.
+    """
+    rendered = render_page(bucket.download(path) if data is None else data)
+    if rendered is None:
+        return {}
+    urls = {}
+    for kind, data in rendered.items():
+        target = derived_path(path, kind)
+        bucket.upload(target, data, file_options={'content-type': 'image/webp', 'upsert': 'true'})
+        urls[f'{kind}_url'] = bucket.get_public_url(target)
+    return urls
+
+def assemble_pdf(pages):
+    """Merge page images (bytes, in order) into one PDF; None if a page can't be read"""
+    images = [_open_image(data) for data in pages]
+    if not images or any(image is None for image in images):
+        return None
+    out = io.BytesIO()
+    images[0].save(out, 'PDF', save_all=True, append_images=images[1:], resolution=110)
+    return out.getvalue()
@@ -0,0 +1,235 @@
+"""
+FetenaHub - Request instrumentation
+
+Records, per Flask route, wall time, the Supabase round trips a request
+made (and the time spent in each) and the response size. A request's
+trace lives in a context variable, so round trips made from
+asyncio.to_thread workers are attributed to the request that started
+them. Results are exposed three ways:
+
+* a `Server-Timing` header on every response (visible in browser devtools)
+* Prometheus text exposition via render()
+* a one-line JSON slow-request log for requests over a threshold
+
+Counters are per process; on Vercel each warm instance reports its own.
+"""
+
+import bisect
+import contextvars
+import json
+import re
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+
+# Histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+# Server-Timing entries per response, besides the totals
+SERVER_TIMING_QUERIES = 10
+
+# HTTP method -> the PostgREST action it performs
+ACTIONS = {'GET': 'select', 'HEAD': 'count', 'POST': 'insert', 'PATCH': 'update', 'DELETE': 'delete'}
+
+class RequestTrace:
+    """Round trips made while serving one request"""
+
+    def __init__(self, route, method):
+        self.route = route
+        self.method = method
+        self.start = time.perf_counter()
+        self.lock = threading.Lock()
+        self.queries = []
+
+    def record(self, name, seconds):
+        with self.lock:
+            self.queries.append((name, seconds))
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def by_query(self):
+        """{query name: [count, seconds]}, slowest first"""
+        totals = defaultdict(lambda: [0, 0.0])
+        with self.lock:
+            for name, seconds in self.queries:
+                totals[name][0] += 1
+                totals[name][1] += seconds
+        return dict(sorted(totals.items(), key=lambda item: item[1][1], reverse=True))
+
+    def db_seconds(self):
+        with self.lock:
+            return sum(seconds for _, seconds in self.queries)
+
+_trace = contextvars.ContextVar('request_trace', default=None)
+
+def start_request(route, method):
+    trace = RequestTrace(route, method)
+    _trace.set(trace)
+    return trace
+
+def current_trace():
+    return _trace.get()
+
+def end_request():
+    _trace.set(None)
+
+def record_query(name, seconds):
+    """Attribute one Supabase round trip to the current request, if any"""
+    trace = _trace.get()
+    if trace is not None:
+        trace.record(name, seconds)
+
+def query_name(method, url, headers=None):
+    """Short label for a Supabase HTTP call, e.g. 'select:exams' or 'rpc:following_exams'"""
+    path = urlsplit(str(url)).path
+    if '/rest/v1/rpc/' in path:
+        return f"rpc:{path.rsplit('/', 1)[-1]}"
+    if '/rest/v1/' in path:
+        action = ACTIONS.get(method, method.lower())
+        if method == 'POST' and 'resolution=' in (headers or {}).get('prefer', ''):
+            action = 'upsert'
+        return f"{action}:{path.split('/rest/v1/', 1)[1].split('/', 1)[0]}"
+    if '/storage/v1/' in path:
+        parts = path.split('/storage/v1/', 1)[1].split('/')
+        # object/<bucket>/..., object/public/<bucket>/..., object/upload/sign/<bucket>/...
+        rest = [p for p in parts[1:] if p not in ('public', 'sign', 'upload', 'info', 'authenticated')]
+        return f"storage:{rest[0] if rest else parts[0]}"
+    return f"http:{method.lower()}"
+
+_TOKEN_RE = re.compile(r'[^A-Za-z0-9_.-]')
+
+def server_timing(trace, total_seconds, by_query=None):
+    """Server-Timing header value for a finished request"""
+    by_query = trace.by_query() if by_query is None else by_query
+    entries = [f'app;dur={total_seconds * 1000:.1f}',
+               f'db;dur={trace.db_seconds() * 1000:.1f};desc="{len(trace.queries)} queries"']
+    for name, (count, seconds) in list(by_query.items())[:SERVER_TIMING_QUERIES]:
+        entries.append(f'db.{_TOKEN_RE.sub(".", name)};dur={seconds * 1000:.1f};desc="x{count}"')
+    return ', '.join(entries)
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += 1
+        self.sum += value
+
+    def cumulative(self):
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            yield bound, running
+
+class Registry:
+    """Per-route request metrics in Prometheus text format"""
+
+    def __init__(self, prefix='fetenahub'):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.requests = defaultdict(int)
+        self.slow = defaultdict(int)
+        self.durations = defaultdict(lambda: Histogram(DURATION_BUCKETS))
+        self.query_counts = defaultdict(lambda: Histogram(QUERY_COUNT_BUCKETS))
+        self.sizes = defaultdict(lambda: Histogram(SIZE_BUCKETS))
+        self.queries = defaultdict(int)
+        self.query_seconds = defaultdict(float)
+
+    def observe(self, trace, status, seconds, size, slow=False, by_query=None):
+        by_query = trace.by_query() if by_query is None else by_query
+        with self._lock:
+            self.requests[(trace.route, trace.method, str(status))] += 1
+            self.durations[trace.route].observe(seconds)
+            self.query_counts[trace.route].observe(len(trace.queries))
+            if size is not None:
+                self.sizes[trace.route].observe(size)
+            for name, (count, query_seconds) in by_query.items():
+                self.queries[(trace.route, name)] += count
+                self.query_seconds[(trace.route, name)] += query_seconds
+            if slow:
+                self.slow[trace.route] += 1
+
+    def reset(self):
+        with self._lock:
+            for metric in (self.requests, self.slow, self.durations, self.query_counts,
+                           self.sizes, self.queries, self.query_seconds):
+                metric.clear()
+
+    def render(self, extra=()):
+        """Prometheus text exposition; `extra` adds (name, type, help, value) gauges/counters"""
+        lines = []
+
+        def header(name, kind, text):
+            lines.append(f'# HELP {self.prefix}_{name} {text}')
+            lines.append(f'# TYPE {self.prefix}_{name} {kind}')
+
+        def sample(name, labels, value):
+            label_text = ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+            lines.append(f'{self.prefix}_{name}{{{label_text}}} {_number(value)}' if label_text
+                         else f'{self.prefix}_{name} {_number(value)}')
+
+        def histograms(name, text, series):
+            header(name, 'histogram', text)
+            for route, histogram in sorted(series.items()):
+                for bound, count in histogram.cumulative():
+                    sample(f'{name}_bucket', {'route': route, 'le': _number(bound)}, count)
+                sample(f'{name}_bucket', {'route': route, 'le': '+Inf'}, histogram.total)
+                sample(f'{name}_sum', {'route': route}, histogram.sum)
+                sample(f'{name}_count', {'route': route}, histogram.total)
+
+        with self._lock:
+            header('requests_total', 'counter', 'Requests served, by route, method and status')
+            for (route, method, status), count in sorted(self.requests.items()):
+                sample('requests_total', {'route': route, 'method': method, 'status': status}, count)
+            histograms('request_duration_seconds', 'Wall time per request', self.durations)
+            histograms('request_queries', 'Supabase round trips per request', self.query_counts)
+            histograms('response_size_bytes', 'Response body size', self.sizes)
+            header('supabase_queries_total', 'counter', 'Supabase round trips, by route and query')
+            for (route, name), count in sorted(self.queries.items()):
+                sample('supabase_queries_total', {'route': route, 'query': name}, count)
+            header('supabase_query_seconds_total', 'counter', 'Time spent in Supabase round trips, by route and query')
+            for (route, name), seconds in sorted(self.query_seconds.items()):
+                sample('supabase_query_seconds_total', {'route': route, 'query': name}, seconds)
+            header('slow_requests_total', 'counter', 'Requests over the slow-request threshold')
+            for route, count in sorted(self.slow.items()):
+                sample('slow_requests_total', {'route': route}, count)
+
+        for name, kind, text, value in extra:
+            if value is None:
+                continue
+            header(name, kind, text)
+            sample(name, {}, value)
+        return '\n'.join(lines) + '\n'
+
+def slow_request_line(trace, path, status, seconds, size, by_query=None):
+    """One-line JSON record for the slow-request log"""
+    by_query = trace.by_query() if by_query is None else by_query
+    return json.dumps({
+        'slow_request': trace.route,
+        'method': trace.method,
+        'path': path,
+        'status': status,
+        'ms': round(seconds * 1000, 1),
+        'db_ms': round(trace.db_seconds() * 1000, 1),
+        'queries': len(trace.queries),
+        'bytes': size,
+        'by_query': {name: {'count': count, 'ms': round(query_seconds * 1000, 1)}
+                     for name, (count, query_seconds) in by_query.items()},
+    })
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _number(value):
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
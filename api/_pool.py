@@ -0,0 +1,64 @@
+"""
+FetenaHub - Pooled Supabase client construction
+
+Imported by _db.get_client when the first client is created; this is where
+supabase, postgrest and httpx get loaded.
+"""
+
+import time
+
+import httpx
+from postgrest.utils import SyncClient
+from supabase import create_client, Client
+
+from _db import metrics, query_observers
+
+
+class PooledTransport(httpx.HTTPTransport):
+    """HTTP transport that reports whether each request opened a new connection"""
+
+    def handle_request(self, request):
+        opened = []
+
+        def trace(event, info):
+            if event == 'connection.connect_tcp.started':
+                opened.append(True)
+
+        request.extensions = {**request.extensions, 'trace': trace}
+        start = time.perf_counter()
+        try:
+            response = super().handle_request(request)
+        except Exception:
+            metrics.record(error=True)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            for observer in query_observers:
+                observer(request, elapsed)
+        metrics.record(new_connection=bool(opened))
+        return response
+
+def _session(base_url, headers, config, transport):
+    return SyncClient(
+        base_url=base_url,
+        headers=headers,
+        timeout=config.timeouts(),
+        follow_redirects=True,
+        transport=transport,
+    )
+
+def create_supabase_client(url, key, config) -> Client:
+    """Create a Supabase client whose REST and Storage calls share one pool"""
+    client = create_client(url, key)
+    transport = PooledTransport(http2=config.http2, limits=config.limits(), retries=config.retries)
+
+    postgrest = client.postgrest
+    postgrest.session.close()
+    postgrest.session = _session(str(postgrest.session.base_url), postgrest.session.headers, config, transport)
+
+    storage = client.storage
+    storage.session.close()
+    storage.session = _session(str(storage.session.base_url), storage.session.headers, config, transport)
+    storage._client = storage.session
+
+    return client
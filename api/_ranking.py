@@ -0,0 +1,48 @@
+"""
+FetenaHub - Trending scores
+
+An exam's trending score is the log of the sum of its event weights, where
+the upload and every like is an event whose weight doubles each half-life
+after a fixed epoch:
+
+    score = ln(sum(2 ** ((t - EPOCH) / half_life)))   over the upload and likes
+
+Since newer events weigh exponentially more, comparing scores ranks exams by
+likes decayed with age, but a stored score never has to be rewritten as time
+passes. A like adds one event (log_add), so the database can keep the column
+current with a trigger and serve `sort=trending` from an index. The SQL in
+DEPLOYMENT.md computes the same values; these are used to recompute scores
+without it and by the benchmarks.
+"""
+
+import math
+from datetime import datetime, timezone
+
+
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+# Below this difference the smaller term no longer changes a double
+_NEGLIGIBLE = 50.0
+
+def event_exponent(timestamp, half_life_hours):
+    """ln of the weight of an event at `timestamp` (ISO string or datetime)"""
+    if not isinstance(timestamp, datetime):
+        timestamp = datetime.fromisoformat(str(timestamp).replace('Z', '+00:00'))
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    hours = (timestamp - EPOCH).total_seconds() / 3600
+    return hours / half_life_hours * math.log(2)
+
+def log_add(a, b):
+    """ln(exp(a) + exp(b)) without overflow"""
+    high, low = max(a, b), min(a, b)
+    if high - low > _NEGLIGIBLE:
+        return high
+    return high + math.log1p(math.exp(low - high))
+
+def trending_score(created_at, like_times, half_life_hours):
+    """Score of an exam uploaded at `created_at` and liked at `like_times`"""
+    exponents = [event_exponent(created_at, half_life_hours)]
+    exponents += [event_exponent(t, half_life_hours) for t in like_times]
+    top = max(exponents)
+    return top + math.log(sum(math.exp(max(x - top, -_NEGLIGIBLE)) for x in exponents))
@@ -0,0 +1,170 @@
+"""
+FetenaHub - Per-user rate limits and load shedding
+
+Rate limits are token buckets, one per (limit name, user): a bucket holds up
+to `burst` tokens, refills at `rate` tokens a second and each request takes
+one (a batch takes one per item). Buckets live in process memory or, when
+CACHE_URL points at Redis, in Redis (updated atomically by a Lua script) so
+all instances share them.
+
+The load shedder watches Supabase round-trip times. While the 90th
+percentile over the last `window` seconds is above the latency budget,
+expensive requests are turned away with 503 instead of queueing behind slow
+queries until the platform times them out. With nothing getting through the
+window empties, so traffic resumes on its own.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+
+
+def parse_limits(spec):
+    """'search=30/60,reports=10/3600' -> {'search': (rate per second, burst)}"""
+    limits = {}
+    for part in filter(None, (p.strip() for p in spec.split(','))):
+        name, _, value = part.partition('=')
+        count, _, seconds = value.partition('/')
+        try:
+            count, seconds = int(count), float(seconds or 1)
+        except ValueError:
+            raise ValueError(f'Invalid rate limit: {part}') from None
+        if count <= 0 or seconds <= 0:
+            raise ValueError(f'Invalid rate limit: {part}')
+        limits[name.strip()] = (count / seconds, count)
+    return limits
+
+def refill(tokens, updated, now, rate, burst, cost=1):
+    """Take `cost` tokens from a bucket; returns (allowed, tokens left, seconds until they are available)"""
+    tokens = min(burst, tokens + max(0.0, now - updated) * rate)
+    if tokens >= cost:
+        return True, tokens - cost, 0.0
+    return False, tokens, (cost - tokens) / rate
+
+class MemoryBucketStore:
+    """Per-process buckets; each instance enforces its own limits"""
+    name = 'memory'
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._buckets = {}   # key -> (tokens, updated, rate, burst)
+
+    def take(self, key, rate, burst, cost=1, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))[:2]
+            allowed, tokens, wait = refill(tokens, updated, now, rate, burst, cost)
+            self._buckets[key] = (tokens, now, rate, burst)
+            if len(self._buckets) > self.maxsize:
+                self._prune(now)
+        return allowed, wait
+
+    def _prune(self, now):
+        # Buckets that have refilled completely carry no state
+        full = [key for key, (tokens, updated, rate, burst) in self._buckets.items()
+                if tokens + (now - updated) * rate >= burst]
+        for key in full:
+            del self._buckets[key]
+
+# KEYS[1] bucket; ARGV rate, burst, now, cost. Returns {allowed, seconds to wait}
+TOKEN_BUCKET_SCRIPT = """
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local rate, burst, now, cost = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4])
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local allowed, wait = 0, 0
+if tokens >= cost then
+  tokens = tokens - cost
+  allowed = 1
+else
+  wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(wait)}
+"""
+
+class RedisBucketStore:
+    """Buckets in Redis, shared by every instance"""
+    name = 'redis'
+
+    def __init__(self, client, prefix='fetenahub:rate:'):
+        self.client = client
+        self.prefix = prefix
+
+    def take(self, key, rate, burst, cost=1, now=None):
+        now = time.time() if now is None else now
+        allowed, wait = self.client.eval(TOKEN_BUCKET_SCRIPT, 1, self.prefix + key, rate, burst, now, cost)
+        return bool(int(allowed)), float(wait)
+
+def create_bucket_store(url=None):
+    """Redis store when a redis:// URL is configured, in-memory otherwise"""
+    if url:
+        import redis
+        return RedisBucketStore(redis.Redis.from_url(url))
+    return MemoryBucketStore()
+
+class RateLimiter:
+    """Named per-user token buckets"""
+
+    def __init__(self, store, limits):
+        self.store = store
+        self.limits = limits
+        self._lock = threading.Lock()
+        self.rejected = {}
+
+    def take(self, name, user_key, cost=1):
+        """(allowed, seconds until the next request would be) for one request
+        counting as `cost` requests"""
+        limit = self.limits.get(name)
+        if limit is None:
+            return True, 0.0
+        rate, burst = limit
+        allowed, wait = self.store.take(f'{name}:{user_key}', rate, burst, cost)
+        if not allowed:
+            with self._lock:
+                self.rejected[name] = self.rejected.get(name, 0) + 1
+        return allowed, wait
+
+class LoadShedder:
+    """Tracks recent Supabase latency against a budget"""
+
+    def __init__(self, budget, window=10.0, min_samples=20, max_samples=512):
+        self.budget = budget
+        self.window = window
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=max_samples)   # (time, seconds)
+        self.shed = 0
+
+    def observe(self, seconds, now=None):
+        if self.budget <= 0:
+            return
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._samples.append((now, seconds))
+
+    def p90(self, now=None):
+        """90th percentile round trip over the window, None with too few samples"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            while self._samples and self._samples[0][0] < now - self.window:
+                self._samples.popleft()
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(seconds for _, seconds in self._samples)
+        return ordered[min(len(ordered) - 1, int(0.9 * len(ordered)))]
+
+    def retry_after(self, now=None):
+        """Seconds to ask clients to wait when over budget, else 0"""
+        if self.budget <= 0:
+            return 0
+        p90 = self.p90(now)
+        if p90 is None or p90 <= self.budget:
+            return 0
+        with self._lock:
+            self.shed += 1
+        return max(1, math.ceil(self.window / 2))
@@ -0,0 +1,209 @@
+"""
+FetenaHub - Exam search backends
+
+Two interchangeable backends rank exams against a free-text query over
+course name, uploader username, university name and teacher name:
+
+* PostgresSearch calls the `search_exams` SQL function (pg_trgm + tsvector,
+  see DEPLOYMENT.md) so filtering, ranking and paging happen in the query.
+* InvertedIndexSearch keeps an in-process inverted index over the same
+  fields for deployments without the SQL function.
+
+Both return a ranked list of (exam_id, rank) pairs.
+"""
+
+import re
+import threading
+import time
+
+
+SEARCH_FIELDS = {
+    # field -> weight used when ranking matches
+    'course': 3.0,
+    'teacher': 2.0,
+    'username': 2.0,
+    'university': 1.0,
+}
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Error codes PostgREST and Postgres use for a function that doesn't exist
+MISSING_FUNCTION_CODES = {'PGRST202', '42883'}
+
+# PostgREST returns at most this many rows per request
+INDEX_PAGE_SIZE = 1000
+
+INDEX_COLUMNS = (
+    'id, created_at, user_id, university_id, course_id, year, teacher_name, '
+    'users!inner(username), universities(name), courses(name)'
+)
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or '').lower())
+
+class SearchBackend:
+    """Interface shared by the search backends"""
+    name = 'base'
+
+    def search(self, client, text, filters, limit, offset=0):
+        """Return up to `limit` (exam_id, rank) pairs, best match first"""
+        raise NotImplementedError
+
+    def invalidate(self):
+        """Drop any cached state after exams change"""
+
+class PostgresSearch(SearchBackend):
+    """Search inside Postgres through the search_exams RPC"""
+    name = 'postgres'
+
+    def search(self, client, text, filters, limit, offset=0):
+        params = {
+            'q': text,
+            'p_university_id': filters.get('university_id'),
+            'p_course_id': filters.get('course_id'),
+            'p_year': int(filters['year']) if filters.get('year') else None,
+            'p_user_id': filters.get('user_id'),
+            'p_follower_id': filters.get('follower_id'),
+            'p_limit': limit,
+            'p_offset': offset,
+        }
+        result = client.rpc('search_exams', params).execute()
+        return [(row['exam_id'], float(row['rank'])) for row in result.data]
+
+class InvertedIndexSearch(SearchBackend):
+    """In-process inverted index over exam search fields.
+
+    The index is built by paging through exams in id order and reused until
+    `ttl` seconds pass or invalidate() is called, so per-search cost depends on the
+    vocabulary and the number of matches rather than on a table scan.
+    """
+    name = 'memory'
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._built_at = 0
+        self._postings = {}   # token -> {exam_id: score}
+        self._docs = {}       # exam_id -> exam metadata used for filters/ordering
+
+    def invalidate(self):
+        with self._lock:
+            self._built_at = 0
+
+    def _ensure_index(self, client):
+        with self._lock:
+            if self._built_at and time.time() - self._built_at < self.ttl:
+                return
+            postings, docs = {}, {}
+            for exam in self._scan(client):
+                docs[exam['id']] = exam
+                fields = {
+                    'course': (exam.get('courses') or {}).get('name'),
+                    'teacher': exam.get('teacher_name'),
+                    'username': (exam.get('users') or {}).get('username'),
+                    'university': (exam.get('universities') or {}).get('name'),
+                }
+                for field, value in fields.items():
+                    for token in tokenize(value):
+                        scores = postings.setdefault(token, {})
+                        scores[exam['id']] = max(scores.get(exam['id'], 0), SEARCH_FIELDS[field])
+            self._postings, self._docs = postings, docs
+            self._built_at = time.time()
+
+    def _scan(self, client):
+        """Yield every exam with its search fields, one keyset page at a time"""
+        last_id = None
+        while True:
+            query = client.table('exams').select(INDEX_COLUMNS).order('id').limit(INDEX_PAGE_SIZE)
+            if last_id is not None:
+                query = query.gt('id', last_id)
+            rows = query.execute().data
+            yield from rows
+            if len(rows) < INDEX_PAGE_SIZE:
+                return
+            last_id = rows[-1]['id']
+
+    def _match_token(self, needle):
+        """Score exams for one query token: exact > prefix > infix"""
+        matches = {}
+        for token, scores in self._postings.items():
+            if token == needle:
+                factor = 1.0
+            elif token.startswith(needle):
+                factor = 0.75
+            elif needle in token:
+                factor = 0.5
+            else:
+                continue
+            for exam_id, weight in scores.items():
+                matches[exam_id] = max(matches.get(exam_id, 0), weight * factor)
+        return matches
+
+    def _passes(self, doc, filters):
+        for key in ('university_id', 'course_id', 'user_id'):
+            if filters.get(key) and str(doc.get(key)) != str(filters[key]):
+                return False
+        if filters.get('year') and str(doc.get('year')) != str(filters['year']):
+            return False
+        if filters.get('following') is not None and doc.get('user_id') not in filters['following']:
+            return False
+        return True
+
+    def search(self, client, text, filters, limit, offset=0):
+        self._ensure_index(client)
+        needles = tokenize(text)
+        if not needles:
+            return []
+
+        # Every query token must match; ranks add up across tokens
+        ranked = None
+        for needle in needles:
+            matches = self._match_token(needle)
+            if ranked is None:
+                ranked = matches
+            else:
+                ranked = {k: ranked[k] + v for k, v in matches.items() if k in ranked}
+            if not ranked:
+                return []
+
+        if filters.get('follower_id'):
+            follows = client.table('follows').select('following_id').eq('follower_id', filters['follower_id']).execute()
+            filters = dict(filters, following={f['following_id'] for f in follows.data})
+
+        hits = [(exam_id, rank) for exam_id, rank in ranked.items()
+                if self._passes(self._docs[exam_id], filters)]
+        hits.sort(key=lambda h: (h[1], self._docs[h[0]]['created_at'], h[0]), reverse=True)
+        return hits[offset:offset + limit]
+
+class AutoSearch(SearchBackend):
+    """Use Postgres search and fall back to the in-process index if the RPC is missing"""
+    name = 'auto'
+
+    def __init__(self, ttl=300):
+        self.primary = PostgresSearch()
+        self.fallback = InvertedIndexSearch(ttl=ttl)
+        self.active = self.primary
+
+    def search(self, client, text, filters, limit, offset=0):
+        if self.active is self.primary:
+            try:
+                return self.primary.search(client, text, filters, limit, offset)
+            except Exception as e:
+                # Only a missing search_exams function means Postgres search isn't
+                # deployed; timeouts and other errors must not switch backends for good
+                if getattr(e, 'code', None) not in MISSING_FUNCTION_CODES:
+                    raise
+                print(f"Search backend fallback: {e}")
+                self.active = self.fallback
+        return self.fallback.search(client, text, filters, limit, offset)
+
+    def invalidate(self):
+        self.fallback.invalidate()
+
+def create_search_backend(kind='auto', ttl=300):
+    """Build the search backend named by SEARCH_BACKEND"""
+    if kind == 'postgres':
+        return PostgresSearch()
+    if kind == 'memory':
+        return InvertedIndexSearch(ttl=ttl)
+    return AutoSearch(ttl=ttl)
@@ -0,0 +1,278 @@
+"""
+FetenaHub - Fan-out-on-write home timelines
+
+When an exam is created its id is pushed into the timeline of every
+follower of the author, so the following feed becomes a read of a
+precomputed, time-ordered id list. Timelines are bounded to `max_len`
+entries. In hybrid mode authors with at least `celebrity_threshold`
+followers are not fanned out; their exams are merged in at read time.
+
+Entries are (score, exam_id, author_id) where score is created_at in
+integer microseconds, which keeps ordering identical to the feed's
+(created_at, id) keyset.
+
+A timeline counts as built only once replace() has written it; one that
+was evicted, or only ever received pushes, is rebuilt on its next read.
+"""
+
+import bisect
+import threading
+from datetime import datetime, timezone
+
+
+def to_score(created_at):
+    """created_at (ISO string) -> integer microseconds since the epoch"""
+    value = datetime.fromisoformat(str(created_at).replace('Z', '+00:00'))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1_000_000)
+
+def from_score(score):
+    return datetime.fromtimestamp(score / 1_000_000, tz=timezone.utc).isoformat()
+
+class MemoryTimelineStore:
+    """Per-process timeline store, for local development and benchmarks"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timelines = {}   # user_id -> ascending list of (score, exam_id, author_id)
+        self._built = set()    # user_ids whose timeline was written by replace()
+        self._celebrities = set()
+
+    def has(self, user_id):
+        with self._lock:
+            return user_id in self._built
+
+    def push(self, user_ids, entry, max_len):
+        with self._lock:
+            for user_id in user_ids:
+                timeline = self._timelines.setdefault(user_id, [])
+                if entry not in timeline:
+                    bisect.insort(timeline, entry)
+                del timeline[:-max_len]
+
+    def replace(self, user_id, entries, max_len):
+        with self._lock:
+            self._timelines[user_id] = sorted(set(entries))[-max_len:]
+            self._built.add(user_id)
+
+    def page(self, user_id, before, count):
+        """Up to `count` (score, exam_id) pairs older than `before`, newest first"""
+        with self._lock:
+            timeline = self._timelines.get(user_id, [])
+            end = bisect.bisect_left(timeline, before) if before else len(timeline)
+            return [(score, exam_id) for score, exam_id, _ in reversed(timeline[max(0, end - count):end])]
+
+    def remove_author(self, user_id, author_id):
+        with self._lock:
+            timeline = self._timelines.get(user_id, [])
+            self._timelines[user_id] = [e for e in timeline if e[2] != author_id]
+
+    def celebrities(self):
+        with self._lock:
+            return set(self._celebrities)
+
+    def set_celebrity(self, user_id, is_celebrity):
+        with self._lock:
+            if is_celebrity:
+                self._celebrities.add(user_id)
+            else:
+                self._celebrities.discard(user_id)
+
+    def replace_celebrities(self, user_ids):
+        with self._lock:
+            self._celebrities = set(user_ids)
+
+class RedisTimelineStore:
+    """Timelines as Redis sorted sets (member "exam_id:author_id", score = created_at µs)"""
+
+    # Extra entries read per page to resolve exams sharing a created_at
+    TIE_SLACK = 20
+
+    # Member scored +inf that replace() writes, so an evicted or partial
+    # timeline can be told apart from one that is built but empty
+    BUILT_MARKER = ''
+
+    def __init__(self, client, prefix='fetenahub:timeline:'):
+        self.client = client
+        self.prefix = prefix
+
+    def _key(self, user_id):
+        return f'{self.prefix}{user_id}'
+
+    def push(self, user_ids, entry, max_len):
+        score, exam_id, author_id = entry
+        pipe = self.client.pipeline(transaction=False)
+        for user_id in user_ids:
+            pipe.zadd(self._key(user_id), {f'{exam_id}:{author_id}': score})
+            # Keep max_len entries plus the marker, which always ranks last
+            pipe.zremrangebyrank(self._key(user_id), 0, -(max_len + 2))
+        pipe.execute()
+
+    def has(self, user_id):
+        return self.client.zscore(self._key(user_id), self.BUILT_MARKER) is not None
+
+    def replace(self, user_id, entries, max_len):
+        entries = sorted(set(entries))[-max_len:]
+        pipe = self.client.pipeline(transaction=True)
+        pipe.delete(self._key(user_id))
+        members = {f'{exam_id}:{author_id}': score for score, exam_id, author_id in entries}
+        pipe.zadd(self._key(user_id), dict(members, **{self.BUILT_MARKER: float('inf')}))
+        pipe.execute()
+
+    def page(self, user_id, before, count):
+        high = before[0] if before else '+inf'
+        rows = self.client.zrevrangebyscore(self._key(user_id), high, '-inf', start=0,
+                                            num=count + self.TIE_SLACK, withscores=True)
+        entries = []
+        for member, score in rows:
+            member = member.decode() if isinstance(member, bytes) else member
+            if member == self.BUILT_MARKER:
+                continue
+            entry = (int(score), member.split(':', 1)[0])
+            if before and entry >= tuple(before):
+                continue
+            entries.append(entry)
+        entries.sort(reverse=True)
+        return entries[:count]
+
+    def remove_author(self, user_id, author_id):
+        members = self.client.zrange(self._key(user_id), 0, -1)
+        stale = [m for m in members if (m.decode() if isinstance(m, bytes) else m).endswith(f':{author_id}')]
+        if stale:
+            self.client.zrem(self._key(user_id), *stale)
+
+    def celebrities(self):
+        return {m.decode() if isinstance(m, bytes) else m for m in self.client.smembers(self.prefix + 'celebrities')}
+
+    def set_celebrity(self, user_id, is_celebrity):
+        if is_celebrity:
+            self.client.sadd(self.prefix + 'celebrities', user_id)
+        else:
+            self.client.srem(self.prefix + 'celebrities', user_id)
+
+    def replace_celebrities(self, user_ids):
+        pipe = self.client.pipeline(transaction=True)
+        pipe.delete(self.prefix + 'celebrities')
+        if user_ids:
+            pipe.sadd(self.prefix + 'celebrities', *user_ids)
+        pipe.execute()
+
+class Timeline:
+    """Fan-out, backfill, prune and rebuild logic on top of a timeline store"""
+
+    MODES = ('off', 'fanout', 'hybrid')
+
+    def __init__(self, store, mode='off', max_len=500, celebrity_threshold=1000, backfill=50):
+        if mode not in self.MODES:
+            raise ValueError(f'TIMELINE_MODE must be one of {self.MODES}')
+        self.store = store
+        self.mode = mode
+        self.max_len = max_len
+        self.celebrity_threshold = celebrity_threshold
+        self.backfill_size = backfill
+
+    @property
+    def enabled(self):
+        return self.mode != 'off'
+
+    def is_celebrity(self, followers_count):
+        return self.mode == 'hybrid' and (followers_count or 0) >= self.celebrity_threshold
+
+    def _follows(self, client, column, user_id, page_size=1000):
+        """Yield the other side of every follow whose `column` is user_id"""
+        other = 'follower_id' if column == 'following_id' else 'following_id'
+        start = 0
+        while True:
+            rows = client.table('follows').select(other).eq(column, user_id) \
+                .order(other).range(start, start + page_size - 1).execute().data
+            yield from (r[other] for r in rows)
+            if len(rows) < page_size:
+                return
+            start += page_size
+
+    def fan_out(self, client, exam):
+        """Push a new exam to its author's followers; returns how many timelines were written.
+
+        Authors that become celebrities stay flagged until the next rebuild,
+        so their earlier exams keep being merged in at read time.
+        """
+        if not self.enabled:
+            return 0
+        if self.mode == 'hybrid':
+            author = client.table('users').select('followers_count').eq('id', exam['user_id']).execute()
+            followers_count = author.data[0].get('followers_count') if author.data else 0
+        else:
+            followers_count = 0
+        if self.is_celebrity(followers_count):
+            self.store.set_celebrity(exam['user_id'], True)
+            return 0
+        followers = list(self._follows(client, 'following_id', exam['user_id']))
+        if followers:
+            self.store.push(followers, (to_score(exam['created_at']), exam['id'], exam['user_id']), self.max_len)
+        return len(followers)
+
+    def backfill(self, client, follower_id, following_id):
+        """Copy a newly followed user's recent exams into the follower's timeline"""
+        if not self.enabled or following_id in self.store.celebrities():
+            return 0
+        rows = client.table('exams').select('id, created_at').eq('user_id', following_id) \
+            .order('created_at', desc=True).limit(self.backfill_size).execute().data
+        for row in rows:
+            self.store.push([follower_id], (to_score(row['created_at']), row['id'], following_id), self.max_len)
+        return len(rows)
+
+    def prune(self, follower_id, following_id):
+        """Drop an unfollowed user's exams from the follower's timeline"""
+        if self.enabled:
+            self.store.remove_author(follower_id, following_id)
+
+    def rebuild_reader(self, client, reader_id, chunk_size=200):
+        """Recreate one reader's timeline from their follows; returns its length"""
+        celebrities = self.store.celebrities()
+        authors = [a for a in self._follows(client, 'follower_id', reader_id) if a not in celebrities]
+        entries = []
+        for start in range(0, len(authors), chunk_size):
+            rows = client.table('exams').select('id, user_id, created_at') \
+                .in_('user_id', authors[start:start + chunk_size]) \
+                .order('created_at', desc=True).order('id', desc=True).limit(self.max_len).execute().data
+            entries += [(to_score(r['created_at']), r['id'], r['user_id']) for r in rows]
+        self.store.replace(reader_id, entries, self.max_len)
+        return min(len(entries), self.max_len)
+
+    def rebuild(self, fetch_all):
+        """Recreate every timeline from the follows and exams tables.
+
+        `fetch_all(table, columns, order)` must yield every row of a table.
+        Returns the number of timelines written.
+        """
+        celebrities = set()
+        if self.mode == 'hybrid':
+            celebrities = {u['id'] for u in fetch_all('users', 'id, followers_count', ['id'])
+                           if self.is_celebrity(u.get('followers_count'))}
+        self.store.replace_celebrities(celebrities)
+
+        # Newest max_len exams per author are all any follower can need
+        by_author = {}
+        for exam in fetch_all('exams', 'id, user_id, created_at', ['id']):
+            if exam['user_id'] in celebrities:
+                continue
+            entries = by_author.setdefault(exam['user_id'], [])
+            bisect.insort(entries, (to_score(exam['created_at']), exam['id'], exam['user_id']))
+            del entries[:-self.max_len]
+
+        followees = {}
+        for row in fetch_all('follows', 'follower_id, following_id', ['follower_id', 'following_id']):
+            followees.setdefault(row['follower_id'], []).append(row['following_id'])
+
+        for follower_id, authors in followees.items():
+            entries = [e for author in authors for e in by_author.get(author, [])]
+            self.store.replace(follower_id, entries, self.max_len)
+        return len(followees)
+
+def create_timeline_store(url=None):
+    """Redis-backed store when a redis:// URL is configured, in-process otherwise"""
+    if url:
+        import redis
+        return RedisTimelineStore(redis.Redis.from_url(url))
+    return MemoryTimelineStore()
@@ -17,6 +17,8 @@ export function ExamCard({ exam, onNavigate, onUpdate }: ExamCardProps) {
   const [isLoading, setIsLoading] = useState(false);
   const { hapticFeedback, shareUrl } = useTelegram();
   const { user: currentUser } = useAuth();
+  const cover = exam.cover ?? exam.files?.[0];
+  const filesCount = exam.files_count ?? exam.files?.length ?? 0;
 
   const handleLike = async (e: React.MouseEvent) => {
     e.stopPropagation();
@@ -117,15 +119,15 @@ export function ExamCard({ exam, onNavigate, onUpdate }: ExamCardProps) {
         </div>
 
         {/* File Preview */}
-        {exam.files && exam.files.length > 0 && (
+        {filesCount > 0 && (
           <div className="exam-card-files">
             <div className="file-indicator">
               <FileText size={16} />
-              <span>{exam.files.length} file{exam.files.length > 1 ? 's' : ''}</span>
+              <span>{filesCount} file{filesCount > 1 ? 's' : ''}</span>
             </div>
-            {exam.files[0]?.file_url && (
+            {cover?.file_url && (
               <img 
-                src={exam.files[0].file_url} 
+                src={cover.thumbnail_url || cover.file_url} 
                 alt="Exam preview"
                 className="exam-card-preview"
                 loading="lazy"
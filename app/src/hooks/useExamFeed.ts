@@ -0,0 +1,73 @@
+import { useState, useEffect, useCallback, useRef } from 'react';
+import { getExams } from '@/lib/api';
+import type { ExamFilters } from '@/lib/api';
+import type { Exam } from '@/types';
+
+// Loads an exam feed one cursor page at a time. Attach `sentinelRef` to an
+// element after the list; the next page is fetched when it scrolls into view.
+// Nothing is requested until `enabled` (e.g. while a filter is still unknown).
+export function useExamFeed(filters: Omit<ExamFilters, 'cursor'>, delay = 0, enabled = true) {
+  const [exams, setExams] = useState<Exam[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [isLoading, setIsLoading] = useState(true);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
+  // Bumped on every reload so pages requested for older filters are dropped
+  const generation = useRef(0);
+  const observer = useRef<IntersectionObserver | null>(null);
+  const key = JSON.stringify(filters);
+
+  const reload = useCallback(async () => {
+    const current = ++generation.current;
+    setIsLoading(true);
+    try {
+      const response = await getExams(JSON.parse(key));
+      if (current !== generation.current) return;
+      setExams(response.exams);
+      setNextCursor(response.next_cursor);
+    } catch (error) {
+      console.error('Failed to load exams:', error);
+    } finally {
+      if (current === generation.current) setIsLoading(false);
+    }
+  }, [key]);
+
+  const loadMore = useCallback(async () => {
+    if (!nextCursor || isLoading || isLoadingMore) return;
+    const current = generation.current;
+    setIsLoadingMore(true);
+    try {
+      const response = await getExams({ ...JSON.parse(key), cursor: nextCursor });
+      if (current !== generation.current) return;
+      setExams((loaded) => {
+        const seen = new Set(loaded.map((exam) => exam.id));
+        return [...loaded, ...response.exams.filter((exam) => !seen.has(exam.id))];
+      });
+      setNextCursor(response.next_cursor);
+    } catch (error) {
+      console.error('Failed to load more exams:', error);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  }, [key, nextCursor, isLoading, isLoadingMore]);
+
+  useEffect(() => {
+    if (!enabled) return;
+    const timeout = setTimeout(reload, delay);
+    return () => clearTimeout(timeout);
+  }, [reload, delay, enabled]);
+
+  // Re-observing whenever loadMore changes also fires for a sentinel that is
+  // still visible after a short page, so the list keeps filling the screen
+  const sentinelRef = useCallback((node: HTMLElement | null) => {
+    observer.current?.disconnect();
+    if (!node) return;
+    observer.current = new IntersectionObserver((entries) => {
+      if (entries[0].isIntersecting) loadMore();
+    }, { rootMargin: '200px' });
+    observer.current.observe(node);
+  }, [loadMore]);
+
+  useEffect(() => () => observer.current?.disconnect(), []);
+
+  return { exams, isLoading, isLoadingMore, hasMore: nextCursor !== null, reload, sentinelRef };
+}
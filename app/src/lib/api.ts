@@ -94,16 +94,21 @@ export const createCourse = async (name: string): Promise<{ course: Course; succ
 
 // ============== EXAM API ==============
 
-interface ExamFilters {
+export interface ExamFilters {
   university_id?: string;
   course_id?: string;
   year?: number;
   search?: string;
   user_id?: string;
   feed_type?: 'all' | 'following';
+  sort?: 'new' | 'top' | 'trending';
+  limit?: number;
+  cursor?: string;
+  view?: 'card';
+  fields?: string;
 }
 
-export const getExams = async (filters: ExamFilters = {}): Promise<{ exams: Exam[] }> => {
+export const getExams = async (filters: ExamFilters = {}): Promise<{ exams: Exam[]; next_cursor: string | null }> => {
   const params = new URLSearchParams();
   Object.entries(filters).forEach(([key, value]) => {
     if (value !== undefined) params.append(key, String(value));
@@ -111,6 +116,27 @@ export const getExams = async (filters: ExamFilters = {}): Promise<{ exams: Exam
   return fetchWithAuth(`/api/exams?${params.toString()}`);
 };
 
+// Visible exam counts per filter value, e.g. "Final · 2023 · 14 exams"
+export type FacetName = 'university_id' | 'course_id' | 'year' | 'exam_type';
+
+export interface ExamFacets {
+  total: number;
+  facets: Record<FacetName, { value: string | number; count: number }[]>;
+  groups?: (Partial<Record<FacetName, string | number>> & { count: number })[];
+}
+
+export const getExamFacets = async (
+  filters: Partial<Record<FacetName, string | number>> = {},
+  groupBy: FacetName[] = []
+): Promise<ExamFacets> => {
+  const params = new URLSearchParams();
+  Object.entries(filters).forEach(([key, value]) => {
+    if (value !== undefined) params.append(key, String(value));
+  });
+  if (groupBy.length > 0) params.append('group_by', groupBy.join(','));
+  return fetchWithAuth(`/api/exams/facets?${params.toString()}`);
+};
+
 export const getExam = async (examId: string): Promise<{ exam: Exam }> => {
   return fetchWithAuth(`/api/exams/${examId}`);
 };
@@ -121,7 +147,7 @@ export const createExam = async (examData: {
   year: number;
   exam_type: string;
   teacher_name?: string;
-  files: string[];
+  files: (string | UploadedPage)[];
 }): Promise<{ exam: Exam; success: boolean }> => {
   return fetchWithAuth('/api/exams', {
     method: 'POST',
@@ -137,26 +163,91 @@ export const unlikeExam = async (examId: string): Promise<{ success: boolean }>
   return fetchWithAuth(`/api/exams/${examId}/like`, { method: 'DELETE' });
 };
 
-// ============== UPLOAD API ==============
+// ============== BATCH ACTIONS API ==============
+
+export type BatchAction =
+  | { type: 'like' | 'unlike'; exam_id: string }
+  | { type: 'follow' | 'unfollow'; user_id: string };
+
+// Per-action outcome; `superseded` actions share the status of a later action
+// on the same target
+export type BatchActionResult = BatchAction & {
+  status: number;
+  error?: string;
+  superseded?: boolean;
+};
 
-export const getUploadUrl = async (filename: string, contentType: string): Promise<{
-  signed_url: string;
-  path: string;
-  token: string;
+// Flush queued taps in one request; the last action per exam/user wins
+export const batchActions = async (actions: BatchAction[]): Promise<{
+  success: boolean;
+  results: BatchActionResult[];
+  failed: number;
+  applied: Record<BatchAction['type'], number>;
 }> => {
+  return fetchWithAuth('/api/actions/batch', {
+    method: 'POST',
+    body: JSON.stringify({ actions }),
+  });
+};
+
+// ============== UPLOAD API ==============
+
+// With the file's SHA-256, content that is already stored comes back with
+// `exists` and its URLs instead of a signed URL
+export const getUploadUrl = async (filename: string, contentType: string, sha256?: string): Promise<
+  | { exists: false; signed_url: string; path: string; token: string }
+  | ({ exists: true; path: string } & ConfirmedUpload)
+> => {
   return fetchWithAuth('/api/upload/url', {
     method: 'POST',
-    body: JSON.stringify({ filename, content_type: contentType }),
+    body: JSON.stringify({ filename, content_type: contentType, sha256 }),
   });
 };
 
-export const confirmUpload = async (path: string): Promise<{ url: string }> => {
+// A confirmed page; the server looks up its hash and derived sizes itself
+export interface UploadedPage {
+  file_url: string;
+  sha256?: string;
+}
+
+export interface ConfirmedUpload {
+  url: string;
+  thumbnail_url?: string;
+  preview_url?: string;
+  sha256: string;
+  duplicate: boolean;
+}
+
+export const confirmUpload = async (path: string): Promise<ConfirmedUpload> => {
   return fetchWithAuth('/api/upload/confirm', {
     method: 'POST',
     body: JSON.stringify({ path }),
   });
 };
 
+export type UploadUrl = Awaited<ReturnType<typeof getUploadUrl>>;
+
+// Batch results come back in request order, each with its own status
+export type BatchResult<T> = (T & { status: 200 }) | { status: number; error: string };
+
+export const getUploadUrls = async (
+  files: { filename: string; content_type: string; sha256?: string }[]
+): Promise<{ results: BatchResult<UploadUrl>[]; failed: number }> => {
+  return fetchWithAuth('/api/upload/urls', {
+    method: 'POST',
+    body: JSON.stringify({ files }),
+  });
+};
+
+export const confirmUploads = async (
+  paths: string[]
+): Promise<{ results: BatchResult<ConfirmedUpload>[]; failed: number }> => {
+  return fetchWithAuth('/api/upload/confirms', {
+    method: 'POST',
+    body: JSON.stringify({ paths }),
+  });
+};
+
 // ============== REPORT API ==============
 
 export const createReport = async (reportData: {
@@ -164,7 +164,7 @@ export function ExamDetailPage({ examId, onNavigate }: ExamDetailPageProps) {
                 </div>
               ) : (
                 <img 
-                  src={exam.files[currentPage]?.file_url} 
+                  src={exam.files[currentPage]?.preview_url || exam.files[currentPage]?.file_url} 
                   alt={`Page ${currentPage + 1}`}
                   className="exam-image"
                   loading="lazy"
@@ -1,35 +1,18 @@
-import { useState, useEffect, useCallback } from 'react';
-import { getExams } from '@/lib/api';
+import { useState } from 'react';
 import { useTelegram } from '@/hooks/useTelegram';
+import { useExamFeed } from '@/hooks/useExamFeed';
 import { ExamCard } from '@/components/ExamCard';
 import { BookOpen, Filter, Users } from 'lucide-react';
-import type { Exam } from '@/types';
 
 interface HomePageProps {
   onNavigate: (page: 'exam-detail' | 'user-profile' | 'search', params?: { examId?: string; userId?: string }) => void;
 }
 
 export function HomePage({ onNavigate }: HomePageProps) {
-  const [exams, setExams] = useState<Exam[]>([]);
-  const [isLoading, setIsLoading] = useState(true);
   const [feedType, setFeedType] = useState<'all' | 'following'>('all');
   const { hapticFeedback } = useTelegram();
-
-  const loadExams = useCallback(async () => {
-    setIsLoading(true);
-    try {
-      const response = await getExams({ feed_type: feedType });
-      setExams(response.exams);
-    } catch (error) {
-      console.error('Failed to load exams:', error);
-    } finally {
-      setIsLoading(false);
-    }
-  }, [feedType]);
-
-  useEffect(() => {
-    loadExams();
-  }, [loadExams]);
+  const { exams, isLoading, isLoadingMore, hasMore, reload, sentinelRef } =
+    useExamFeed({ feed_type: feedType, view: 'card' });
 
   const handleFeedTypeChange = (type: 'all' | 'following') => {
     hapticFeedback('light');
@@ -82,9 +65,14 @@ export function HomePage({ onNavigate }: HomePageProps) {
               key={exam.id} 
               exam={exam} 
               onNavigate={onNavigate}
-              onUpdate={loadExams}
+              onUpdate={reload}
             />
           ))}
+          {hasMore && (
+            <div ref={sentinelRef} className="loading-container">
+              {isLoadingMore && <div className="spinner" />}
+            </div>
+          )}
         </div>
       ) : (
         <div className="empty-state">
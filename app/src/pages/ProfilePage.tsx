@@ -1,10 +1,11 @@
 import { useState, useEffect, useCallback } from 'react';
 import { FileText, Heart, Edit2, Check, X } from 'lucide-react';
-import { getProfile, updateProfile, getExams } from '@/lib/api';
+import { getProfile, updateProfile } from '@/lib/api';
 import { useTelegram } from '@/hooks/useTelegram';
 import { useAuth } from '@/hooks/useAuth';
+import { useExamFeed } from '@/hooks/useExamFeed';
 import { ExamCard } from '@/components/ExamCard';
-import type { User, Exam } from '@/types';
+import type { User } from '@/types';
 
 interface ProfilePageProps {
   onNavigate: (page: 'exam-detail' | 'user-profile', params: { examId?: string; userId?: string }) => void;
@@ -12,7 +13,6 @@ interface ProfilePageProps {
 
 export function ProfilePage({ onNavigate }: ProfilePageProps) {
   const [profile, setProfile] = useState<User | null>(null);
-  const [exams, setExams] = useState<Exam[]>([]);
   const [isLoading, setIsLoading] = useState(true);
   const [isEditing, setIsEditing] = useState(false);
   const [editUsername, setEditUsername] = useState('');
@@ -21,16 +21,14 @@ export function ProfilePage({ onNavigate }: ProfilePageProps) {
   
   const { hapticFeedback, showAlert } = useTelegram();
   const { user: currentUser, refreshUser } = useAuth();
+  const { exams, isLoading: examsLoading, isLoadingMore, hasMore, reload, sentinelRef } =
+    useExamFeed({ user_id: currentUser?.id, view: 'card' }, 0, Boolean(currentUser?.id));
 
   const loadProfile = useCallback(async () => {
     setIsLoading(true);
     try {
-      const [profileRes, examsRes] = await Promise.all([
-        getProfile(),
-        getExams({ user_id: currentUser?.id }),
-      ]);
+      const profileRes = await getProfile();
       setProfile(profileRes.user);
-      setExams(examsRes.exams);
       setEditUsername(profileRes.user.username);
       setEditBio(profileRes.user.bio || '');
     } catch (error) {
@@ -38,7 +36,7 @@ export function ProfilePage({ onNavigate }: ProfilePageProps) {
     } finally {
       setIsLoading(false);
     }
-  }, [currentUser?.id]);
+  }, []);
 
   useEffect(() => {
     loadProfile();
@@ -59,6 +57,11 @@ export function ProfilePage({ onNavigate }: ProfilePageProps) {
     }
   };
 
+  const handleExamUpdate = () => {
+    loadProfile();
+    reload();
+  };
+
   const handleCancelEdit = () => {
     setIsEditing(false);
     setEditUsername(profile?.username || '');
@@ -144,7 +147,7 @@ export function ProfilePage({ onNavigate }: ProfilePageProps) {
         {/* Stats */}
         <div className="profile-stats">
           <div className="stat">
-            <span className="stat-value">{exams.length}</span>
+            <span className="stat-value">{profile.exams_count || 0}</span>
             <span className="stat-label">Uploads</span>
           </div>
           <div className="stat">
@@ -179,16 +182,25 @@ export function ProfilePage({ onNavigate }: ProfilePageProps) {
       {/* Content */}
       <div className="profile-content">
         {activeTab === 'uploads' ? (
-          exams.length > 0 ? (
+          examsLoading ? (
+            <div className="loading-container">
+              <div className="spinner" />
+            </div>
+          ) : exams.length > 0 ? (
             <div className="exams-list">
               {exams.map((exam) => (
                 <ExamCard 
                   key={exam.id} 
                   exam={exam} 
                   onNavigate={onNavigate}
-                  onUpdate={loadProfile}
+                  onUpdate={handleExamUpdate}
                 />
               ))}
+              {hasMore && (
+                <div ref={sentinelRef} className="loading-container">
+                  {isLoadingMore && <div className="spinner" />}
+                </div>
+              )}
             </div>
           ) : (
             <div className="empty-state">
@@ -1,9 +1,10 @@
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect } from 'react';
 import { Search, X, Building2, BookOpen, Calendar } from 'lucide-react';
-import { getExams, getUniversities, getCourses } from '@/lib/api';
+import { getUniversities, getCourses } from '@/lib/api';
 import { useTelegram } from '@/hooks/useTelegram';
+import { useExamFeed } from '@/hooks/useExamFeed';
 import { ExamCard } from '@/components/ExamCard';
-import type { Exam, University, Course } from '@/types';
+import type { University, Course } from '@/types';
 
 interface SearchPageProps {
   onNavigate: (page: 'exam-detail' | 'user-profile', params: { examId?: string; userId?: string }) => void;
@@ -11,10 +12,8 @@ interface SearchPageProps {
 
 export function SearchPage({ onNavigate }: SearchPageProps) {
   const [searchQuery, setSearchQuery] = useState('');
-  const [exams, setExams] = useState<Exam[]>([]);
   const [universities, setUniversities] = useState<University[]>([]);
   const [courses, setCourses] = useState<Course[]>([]);
-  const [isLoading, setIsLoading] = useState(false);
   const [showFilters, setShowFilters] = useState(false);
   
   // Filters
@@ -43,27 +42,14 @@ export function SearchPage({ onNavigate }: SearchPageProps) {
     loadFilters();
   }, []);
 
-  const searchExams = useCallback(async () => {
-    setIsLoading(true);
-    try {
-      const response = await getExams({
-        search: searchQuery || undefined,
-        university_id: selectedUniversity || undefined,
-        course_id: selectedCourse || undefined,
-        year: selectedYear ? parseInt(selectedYear) : undefined,
-      });
-      setExams(response.exams);
-    } catch (error) {
-      console.error('Search error:', error);
-    } finally {
-      setIsLoading(false);
-    }
-  }, [searchQuery, selectedUniversity, selectedCourse, selectedYear]);
-
-  useEffect(() => {
-    const timeout = setTimeout(searchExams, 300);
-    return () => clearTimeout(timeout);
-  }, [searchExams]);
+  // Typing restarts the 300 ms debounce before the first page is requested
+  const { exams, isLoading, isLoadingMore, hasMore, sentinelRef } = useExamFeed({
+    search: searchQuery || undefined,
+    university_id: selectedUniversity || undefined,
+    course_id: selectedCourse || undefined,
+    year: selectedYear ? parseInt(selectedYear) : undefined,
+    view: 'card',
+  }, 300);
 
   const clearFilters = () => {
     hapticFeedback('light');
@@ -179,7 +165,9 @@ export function SearchPage({ onNavigate }: SearchPageProps) {
           </div>
         ) : exams.length > 0 ? (
           <>
-            <p className="results-count">{exams.length} exam{exams.length !== 1 ? 's' : ''} found</p>
+            <p className="results-count">
+              {exams.length}{hasMore ? '+' : ''} exam{exams.length !== 1 || hasMore ? 's' : ''} found
+            </p>
             <div className="exams-list">
               {exams.map((exam) => (
                 <ExamCard 
@@ -188,6 +176,11 @@ export function SearchPage({ onNavigate }: SearchPageProps) {
                   onNavigate={onNavigate}
                 />
               ))}
+              {hasMore && (
+                <div ref={sentinelRef} className="loading-container">
+                  {isLoadingMore && <div className="spinner" />}
+                </div>
+              )}
             </div>
           </>
         ) : (
@@ -1,6 +1,7 @@
 import { useState, useEffect, useRef, useCallback } from 'react';
 import { X, FileText, Plus } from 'lucide-react';
-import { getUniversities, getCourses, createUniversity, createCourse, createExam, getUploadUrl, confirmUpload } from '@/lib/api';
+import { getUniversities, getCourses, createUniversity, createCourse, createExam, getUploadUrls, confirmUploads } from '@/lib/api';
+import type { UploadedPage } from '@/lib/api';
 import { useTelegram } from '@/hooks/useTelegram';
 import { useAuth } from '@/hooks/useAuth';
 import type { University, Course, UploadFile } from '@/types';
@@ -82,48 +83,71 @@ export function UploadPage({ onNavigate }: UploadPageProps) {
     hapticFeedback('light');
   };
 
-  const uploadFileToStorage = async (uploadFile: UploadFile, index: number): Promise<string> => {
-    setFiles(prev => {
-      const newFiles = [...prev];
-      newFiles[index].uploading = true;
-      return newFiles;
-    });
+  const setUploading = (uploading: boolean) => {
+    setFiles(prev => prev.map(f => ({ ...f, uploading })));
+  };
+
+  // One request for every signed URL and one to confirm every page, with the
+  // transfers in between running in parallel
+  const uploadFilesToStorage = async (uploadFiles: UploadFile[]): Promise<UploadedPage[]> => {
+    setUploading(true);
 
     try {
-      const { signed_url, path } = await getUploadUrl(
-        uploadFile.file.name,
-        uploadFile.file.type
-      );
-
-      const response = await fetch(signed_url, {
-        method: 'PUT',
-        body: uploadFile.file,
-        headers: {
-          'Content-Type': uploadFile.file.type,
-        },
+      const hashes = await Promise.all(uploadFiles.map(async ({ file }) => {
+        const digest = await crypto.subtle.digest('SHA-256', await file.arrayBuffer());
+        return Array.from(new Uint8Array(digest), b => b.toString(16).padStart(2, '0')).join('');
+      }));
+
+      const { results: uploads } = await getUploadUrls(uploadFiles.map(({ file }, i) => ({
+        filename: file.name,
+        content_type: file.type,
+        sha256: hashes[i],
+      })));
+      const signed = uploads.map(upload => {
+        if ('error' in upload) {
+          throw new Error(upload.error);
+        }
+        return upload;
       });
 
-      if (!response.ok) {
-        throw new Error('Upload failed');
-      }
+      // Skip the transfer when the same file is already stored; identical
+      // pages share a path and are sent once
+      const transfers = new Map<string, { signedUrl: string; file: File }>();
+      signed.forEach((upload, i) => {
+        if (!upload.exists && !transfers.has(upload.path)) {
+          transfers.set(upload.path, { signedUrl: upload.signed_url, file: uploadFiles[i].file });
+        }
+      });
+      await Promise.all([...transfers.values()].map(async ({ signedUrl, file }) => {
+        const response = await fetch(signedUrl, {
+          method: 'PUT',
+          body: file,
+          headers: {
+            'Content-Type': file.type,
+          },
+        });
 
-      const { url } = await confirmUpload(path);
+        if (!response.ok) {
+          throw new Error('Upload failed');
+        }
+      }));
 
-      setFiles(prev => {
-        const newFiles = [...prev];
-        newFiles[index].uploading = false;
-        newFiles[index].progress = 100;
-        newFiles[index].url = url;
-        return newFiles;
+      const pending = [...transfers.keys()];
+      const { results: confirmed } = pending.length > 0 ? await confirmUploads(pending) : { results: [] };
+      const confirmedByPath = new Map(pending.map((path, i) => [path, confirmed[i]]));
+
+      const pages = signed.map((upload, i) => {
+        const result = upload.exists ? upload : confirmedByPath.get(upload.path)!;
+        if ('error' in result) {
+          throw new Error(result.error);
+        }
+        return { file_url: result.url, sha256: hashes[i] };
       });
 
-      return url;
+      setFiles(prev => prev.map((f, i) => ({ ...f, uploading: false, progress: 100, url: pages[i]?.file_url })));
+      return pages;
     } catch (error) {
-      setFiles(prev => {
-        const newFiles = [...prev];
-        newFiles[index].uploading = false;
-        return newFiles;
-      });
+      setUploading(false);
       throw error;
     }
   };
@@ -168,11 +192,7 @@ export function UploadPage({ onNavigate }: UploadPageProps) {
     setMainButtonLoading(true);
 
     try {
-      const fileUrls: string[] = [];
-      for (let i = 0; i < files.length; i++) {
-        const url = await uploadFileToStorage(files[i], i);
-        fileUrls.push(url);
-      }
+      const pages = await uploadFilesToStorage(files);
 
       await createExam({
         university_id: selectedUniversity,
@@ -180,7 +200,7 @@ export function UploadPage({ onNavigate }: UploadPageProps) {
         year: parseInt(year),
         exam_type: examType,
         teacher_name: teacherName,
-        files: fileUrls,
+        files: pages,
       });
 
       hapticFeedback('success');
@@ -188,7 +208,10 @@ export function UploadPage({ onNavigate }: UploadPageProps) {
       onNavigate('home');
     } catch (error) {
       console.error('Upload error:', error);
-      showAlert('Failed to upload exam. Please try again.');
+      const message = error instanceof Error ? error.message : '';
+      showAlert(message === 'This exam has already been uploaded'
+        ? message
+        : 'Failed to upload exam. Please try again.');
     } finally {
       setIsLoading(false);
       setMainButtonLoading(false);
@@ -1,11 +1,12 @@
 import { useState, useEffect, useCallback } from 'react';
 import { UserPlus, UserCheck, FileText, Flag } from 'lucide-react';
-import { getUserProfile, followUser, unfollowUser, getExams } from '@/lib/api';
+import { getUserProfile, followUser, unfollowUser } from '@/lib/api';
 import { useTelegram } from '@/hooks/useTelegram';
 import { useAuth } from '@/hooks/useAuth';
+import { useExamFeed } from '@/hooks/useExamFeed';
 import { ExamCard } from '@/components/ExamCard';
 import { ReportModal } from '@/components/ReportModal';
-import type { User, Exam } from '@/types';
+import type { User } from '@/types';
 
 interface UserProfilePageProps {
   userId: string;
@@ -14,7 +15,6 @@ interface UserProfilePageProps {
 
 export function UserProfilePage({ userId, onNavigate }: UserProfilePageProps) {
   const [profile, setProfile] = useState<User | null>(null);
-  const [exams, setExams] = useState<Exam[]>([]);
   const [isLoading, setIsLoading] = useState(true);
   const [isFollowing, setIsFollowing] = useState(false);
   const [followLoading, setFollowLoading] = useState(false);
@@ -22,17 +22,15 @@ export function UserProfilePage({ userId, onNavigate }: UserProfilePageProps) {
   
   const { hapticFeedback, showAlert, showConfirm } = useTelegram();
   const { user: currentUser } = useAuth();
+  const { exams, isLoading: examsLoading, isLoadingMore, hasMore, sentinelRef } =
+    useExamFeed({ user_id: userId, view: 'card' });
 
   const loadProfile = useCallback(async () => {
     setIsLoading(true);
     try {
-      const [profileRes, examsRes] = await Promise.all([
-        getUserProfile(userId),
-        getExams({ user_id: userId }),
-      ]);
+      const profileRes = await getUserProfile(userId);
       setProfile(profileRes.user);
       setIsFollowing(profileRes.user.is_following || false);
-      setExams(examsRes.exams);
     } catch (error) {
       console.error('Failed to load user profile:', error);
     } finally {
@@ -117,7 +115,7 @@ export function UserProfilePage({ userId, onNavigate }: UserProfilePageProps) {
         {/* Stats */}
         <div className="profile-stats">
           <div className="stat">
-            <span className="stat-value">{exams.length}</span>
+            <span className="stat-value">{profile.exams_count || 0}</span>
             <span className="stat-label">Uploads</span>
           </div>
           <div className="stat">
@@ -164,7 +162,11 @@ export function UserProfilePage({ userId, onNavigate }: UserProfilePageProps) {
           <FileText size={18} /> Uploads
         </h2>
         
-        {exams.length > 0 ? (
+        {examsLoading ? (
+          <div className="loading-container">
+            <div className="spinner" />
+          </div>
+        ) : exams.length > 0 ? (
           <div className="exams-list">
             {exams.map((exam) => (
               <ExamCard 
@@ -173,6 +175,11 @@ export function UserProfilePage({ userId, onNavigate }: UserProfilePageProps) {
                 onNavigate={onNavigate}
               />
             ))}
+            {hasMore && (
+              <div ref={sentinelRef} className="loading-container">
+                {isLoadingMore && <div className="spinner" />}
+              </div>
+            )}
           </div>
         ) : (
           <div className="empty-state">
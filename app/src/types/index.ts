@@ -9,6 +9,7 @@ export interface User {
   avatar_url: string;
   followers_count?: number;
   following_count?: number;
+  exams_count?: number;
   is_following?: boolean;
 }
 
@@ -34,6 +35,7 @@ export interface Exam {
   exam_type: 'Mid' | 'Final' | 'Quiz' | 'Other';
   teacher_name?: string;
   is_hidden?: boolean;
+  pdf_url?: string | null;
   // Joined data
   users?: User;
   universities?: University;
@@ -41,6 +43,9 @@ export interface Exam {
   files?: ExamFile[];
   is_liked?: boolean;
   likes_count?: number;
+  // Card view: first page and page count instead of files
+  cover?: Partial<ExamFile> | null;
+  files_count?: number;
 }
 
 export interface ExamFile {
@@ -48,6 +53,8 @@ export interface ExamFile {
   created_at: string;
   exam_id: string;
   file_url: string;
+  thumbnail_url?: string | null;
+  preview_url?: string | null;
   page_order: number;
 }
 
@@ -1,5 +1,5 @@
 from flask import Flask, request, jsonify
-from supabase import create_client, Client
+from supabase import Client
 import os
 from werkzeug.utils import secure_filename
 import hashlib
@@ -8,16 +8,25 @@ import json
 from dotenv import load_dotenv
 from urllib.parse import parse_qsl
 
+# Before the local modules below, which read their settings (e.g.
+# MAX_UPLOAD_MB) from the environment when imported
 load_dotenv()
 
+from db import create_pooled_client, pool_stats
+from uploads import MAX_UPLOAD_SIZE, UploadError, stream_upload
+
 app = Flask(__name__)
 
+# Multipart bodies above the limit are refused before they are parsed
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_SIZE + 1024 * 1024
+
 # Supabase setup
 SUPABASE_URL = os.getenv('SUPABASE_URL')
 SUPABASE_KEY = os.getenv('SUPABASE_ANON_KEY')
 TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+# One client per Gunicorn worker, its requests sharing a keep-alive connection pool
+supabase: Client = create_pooled_client(SUPABASE_URL, SUPABASE_KEY)
 
 # Allowed file extensions
 ALLOWED_EXTENSIONS = {'pdf', 'jpg', 'jpeg', 'png'}
@@ -54,7 +63,11 @@ def verify_telegram_data(init_data: str) -> bool:
 
 @app.route('/')
 def home():
-    return jsonify({'message': 'ExamHub Backend is running!', 'endpoints': ['/exams', '/upload']})
+    return jsonify({'message': 'ExamHub Backend is running!', 'endpoints': ['/exams', '/upload', '/upload/stream']})
+
+@app.route('/health')
+def health():
+    return jsonify({'status': 'ok', 'pool': pool_stats()})
 
 @app.route('/exams', methods=['GET'])
 def get_exams():
@@ -98,8 +111,49 @@ def upload_exam():
     filename = secure_filename(file.filename)
     file_path = f"exams/{user_id}/{filename}"
     
-    # Upload to Supabase Storage
-    supabase.storage.from_('exam-files').upload(file_path, file.read())
+    # Werkzeug spools the part to a temp file; forward it in chunks from there
+    file.stream.seek(0, os.SEEK_END)
+    length = file.stream.tell()
+    file.stream.seek(0)
+    
+    return store_exam(file.stream, length, filename, file_path, university, year, subject, user_id)
+
+@app.route('/upload/stream', methods=['PUT'])
+def upload_exam_stream():
+    """Upload a raw request body, forwarded to storage while it is received.
+
+    Metadata goes in the query string (filename, university, year, subject)
+    and the Telegram initData in the X-Telegram-Init-Data header.
+    """
+    init_data = request.headers.get('X-Telegram-Init-Data')
+    if not verify_telegram_data(init_data):
+        return jsonify({'error': 'Invalid Telegram data'}), 401
+    
+    user_data = json.loads(dict(parse_qsl(init_data)).get('user') or '{}')
+    user_id = user_data.get('id')
+    if not user_id:
+        return jsonify({'error': 'Invalid Telegram data'}), 401
+    
+    filename = secure_filename(request.args.get('filename', ''))
+    if filename == '' or not allowed_file(filename):
+        return jsonify({'error': 'Invalid file'}), 400
+    
+    university = request.args.get('university')
+    year = request.args.get('year')
+    subject = request.args.get('subject')
+    
+    if not all([university, year, subject]):
+        return jsonify({'error': 'Missing metadata'}), 400
+    
+    file_path = f"exams/{user_id}/{filename}"
+    return store_exam(request.stream, request.content_length, filename, file_path, university, year, subject, user_id)
+
+def store_exam(stream, length, filename, file_path, university, year, subject, user_id):
+    """Stream a file to storage and record the exam"""
+    try:
+        stream_upload(supabase.storage, 'exam-files', file_path, stream, length, filename.rsplit('.', 1)[1])
+    except UploadError as e:
+        return jsonify({'error': str(e)}), e.status
     file_url = supabase.storage.from_('exam-files').get_public_url(file_path)
     
     # Save to database
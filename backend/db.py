@@ -0,0 +1,71 @@
+"""
+ExamHub Backend - Pooled Supabase client
+
+app.py creates the client once at import, which Gunicorn does in each
+worker (the Procfile runs four, without --preload). A worker's PostgREST
+and Storage calls, including the resumable upload PATCHes, then reuse
+keep-alive connections from one shared httpx transport. Pool size and
+timeouts use the same SUPABASE_* variables as the API (see DEPLOYMENT.md);
+/health reports how many requests reused a connection.
+"""
+
+import os
+import threading
+
+import httpx
+from postgrest.utils import SyncClient
+from supabase import create_client, Client
+
+_lock = threading.Lock()
+_counts = {'hits': 0, 'misses': 0, 'errors': 0}
+
+def _record(outcome):
+    with _lock:
+        _counts[outcome] += 1
+
+class PooledTransport(httpx.HTTPTransport):
+    """HTTP transport that counts requests served on a reused connection (hit) or a new one (miss)"""
+
+    def handle_request(self, request):
+        opened = []
+
+        def trace(event, info):
+            if event == 'connection.connect_tcp.started':
+                opened.append(True)
+
+        request.extensions = {**request.extensions, 'trace': trace}
+        try:
+            response = super().handle_request(request)
+        except Exception:
+            _record('errors')
+            raise
+        _record('misses' if opened else 'hits')
+        return response
+
+def create_pooled_client(url, key, env=os.environ) -> Client:
+    """Create a Supabase client whose REST and Storage calls share one pool"""
+    transport = PooledTransport(
+        http2=env.get('SUPABASE_HTTP2', '1') == '1',
+        retries=int(env.get('SUPABASE_CONNECT_RETRIES', '1')),
+        limits=httpx.Limits(
+            max_connections=int(env.get('SUPABASE_POOL_SIZE', '20')),
+            max_keepalive_connections=int(env.get('SUPABASE_POOL_KEEPALIVE', '10')),
+            keepalive_expiry=float(env.get('SUPABASE_POOL_KEEPALIVE_EXPIRY', '60')),
+        ),
+    )
+    timeout = httpx.Timeout(float(env.get('SUPABASE_TIMEOUT', '10')),
+                            connect=float(env.get('SUPABASE_CONNECT_TIMEOUT', '5')))
+
+    client = create_client(url, key)
+    for service in (client.postgrest, client.storage):
+        session = service.session
+        session.close()
+        service.session = SyncClient(base_url=str(session.base_url), headers=session.headers,
+                                     timeout=timeout, follow_redirects=True, transport=transport)
+    client.storage._client = client.storage.session
+    return client
+
+def pool_stats():
+    with _lock:
+        total = _counts['hits'] + _counts['misses']
+        return {**_counts, 'hit_ratio': round(_counts['hits'] / total, 3) if total else None}
@@ -0,0 +1,153 @@
+"""
+ExamHub Backend - Streaming uploads to Supabase Storage
+
+Forwards an upload body to storage without holding the whole file in
+memory. The file type is checked against its first bytes, the size
+against the declared length, and bodies larger than one chunk go through
+Storage's resumable (TUS) endpoint in fixed-size chunks, so memory per
+upload stays at about one chunk whatever the file size. A failed chunk is
+resumed from the offset the server reports.
+"""
+
+import base64
+import os
+
+
+# Supabase's resumable endpoint requires 6 MiB chunks (except the last one)
+CHUNK_SIZE = 6 * 1024 * 1024
+
+MAX_UPLOAD_SIZE = int(os.getenv('MAX_UPLOAD_MB', '100')) * 1024 * 1024
+
+CHUNK_RETRIES = int(os.getenv('UPLOAD_CHUNK_RETRIES', '3'))
+
+# extension -> (content type, leading bytes of a valid file)
+FILE_TYPES = {
+    'pdf': ('application/pdf', (b'%PDF-',)),
+    'jpg': ('image/jpeg', (b'\xff\xd8\xff',)),
+    'jpeg': ('image/jpeg', (b'\xff\xd8\xff',)),
+    'png': ('image/png', (b'\x89PNG\r\n\x1a\n',)),
+}
+
+class UploadError(Exception):
+    """Upload rejected or failed; `status` is the HTTP status to answer with"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+def sniff_content_type(head, extension):
+    """Content type for a file whose first bytes are `head`, checked against its extension"""
+    content_type, signatures = FILE_TYPES.get(extension.lower(), (None, ()))
+    if not content_type:
+        raise UploadError('Unsupported file type')
+    if not any(head.startswith(signature) for signature in signatures):
+        raise UploadError(f'File content does not match .{extension}')
+    return content_type
+
+def read_chunks(stream, length, chunk_size=CHUNK_SIZE):
+    """Yield exactly `length` bytes from `stream` in chunk_size pieces"""
+    remaining = length
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        parts, received = [], 0
+        while received < size:
+            data = stream.read(size - received)
+            if not data:
+                raise UploadError('Upload body ended early')
+            parts.append(data)
+            received += len(data)
+        remaining -= size
+        chunk = parts[0] if len(parts) == 1 else b''.join(parts)
+        # Only the joined chunk stays alive while the caller sends it
+        del parts
+        yield chunk
+
+def _metadata(**values):
+    return ','.join(f'{k} {base64.b64encode(v.encode()).decode()}' for k, v in values.items())
+
+class ResumableUpload:
+    """Client for Storage's TUS endpoint (POST to create, PATCH per chunk)"""
+
+    def __init__(self, session, bucket, path, length, content_type, upsert=False):
+        self.session = session
+        self.bucket = bucket
+        self.path = path
+        self.length = length
+        self.content_type = content_type
+        self.upsert = upsert
+        self.location = None
+        self.offset = 0
+
+    def create(self):
+        response = self.session.post('upload/resumable', headers={
+            'Tus-Resumable': '1.0.0',
+            'Upload-Length': str(self.length),
+            'Upload-Metadata': _metadata(bucketName=self.bucket, objectName=self.path,
+                                         contentType=self.content_type),
+            'x-upsert': 'true' if self.upsert else 'false',
+        })
+        if response.status_code != 201:
+            raise UploadError(f'Could not start upload: {response.text}', 502)
+        self.location = response.headers['Location']
+
+    def _server_offset(self):
+        response = self.session.head(self.location, headers={'Tus-Resumable': '1.0.0'})
+        return int(response.headers.get('Upload-Offset', self.offset))
+
+    def send(self, chunk):
+        """PATCH one chunk, resuming from the server's offset after a failure"""
+        start = self.offset
+        end = start + len(chunk)
+        for attempt in range(CHUNK_RETRIES + 1):
+            try:
+                # httpx keeps each request (and its body) in a reference cycle
+                # with the response; a one-shot iterator lets the chunk go as
+                # soon as it is sent instead of at the next cyclic GC
+                body = chunk[self.offset - start:]
+                response = self.session.patch(self.location, content=iter([body]), headers={
+                    'Tus-Resumable': '1.0.0',
+                    'Upload-Offset': str(self.offset),
+                    'Content-Type': 'application/offset+octet-stream',
+                    'Content-Length': str(len(body)),
+                })
+                del body
+                if response.status_code == 204:
+                    self.offset = int(response.headers['Upload-Offset'])
+                    return
+                error = response.text
+            except Exception as e:
+                error = str(e)
+            if attempt == CHUNK_RETRIES:
+                raise UploadError(f'Chunk upload failed at offset {self.offset}: {error}', 502)
+            self.offset = max(start, min(self._server_offset(), end))
+            if self.offset == end:
+                return
+
+def stream_upload(storage, bucket, path, stream, length, extension, max_size=MAX_UPLOAD_SIZE):
+    """Upload `length` bytes from `stream` to bucket/path and return the content type.
+
+    `storage` is a Supabase storage client; its HTTP session is reused for
+    the resumable protocol.
+    """
+    if length is None:
+        raise UploadError('Content-Length is required', 411)
+    if length <= 0:
+        raise UploadError('Empty file')
+    if length > max_size:
+        raise UploadError(f'File is larger than {max_size // (1024 * 1024)} MB', 413)
+
+    chunks = read_chunks(stream, length)
+    first = next(chunks)
+    content_type = sniff_content_type(first[:16], extension)
+
+    if length <= CHUNK_SIZE:
+        storage.from_(bucket).upload(path, first, {'content-type': content_type})
+        return content_type
+
+    upload = ResumableUpload(storage.session, bucket, path, length, content_type)
+    upload.create()
+    upload.send(first)
+    del first
+    for chunk in chunks:
+        upload.send(chunk)
+    return content_type
@@ -0,0 +1,57 @@
+"""
+Benchmark: p50/p99 latency of the profile and exam detail endpoints with
+their independent queries run concurrently versus one after another.
+
+Usage: python bench/bench_async.py [--latency 0.02] [--requests 50]
+"""
+
+import argparse
+import statistics
+import time
+
+from common import FakeSupabase, init_data, load_api, seed
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def measure(client, url, headers, requests):
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = client.get(url, headers=headers)
+        samples.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.get_json()
+    return samples
+
+
+def run(latency, requests):
+    fake = FakeSupabase(latency=latency)
+    users = seed(fake, exams=50)
+    api = load_api(fake)
+    client = api.app.test_client()
+    headers = {'X-Telegram-Auth': init_data(users[0]['telegram_id'])}
+    client.get('/api/exams?limit=1', headers=headers)  # warm the auth cache
+
+    endpoints = {
+        'profile': f"/api/user/profile/{users[3]['id']}",
+        'exam': f"/api/exams/{fake.tables['exams'][0]['id']}",
+    }
+    print(f"{'endpoint':>8} {'mode':>11} {'p50 ms':>8} {'p99 ms':>8} {'mean ms':>8}")
+    for name, url in endpoints.items():
+        for concurrent in (False, True):
+            api.CONCURRENT_QUERIES = concurrent
+            samples = measure(client, url, headers, requests)
+            mode = 'concurrent' if concurrent else 'sequential'
+            print(f"{name:>8} {mode:>11} {percentile(samples, 50):>8.1f} "
+                  f"{percentile(samples, 99):>8.1f} {statistics.mean(samples):>8.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--latency', type=float, default=0.02, help='simulated seconds per round trip')
+    parser.add_argument('--requests', type=int, default=50)
+    args = parser.parse_args()
+    run(args.latency, args.requests)
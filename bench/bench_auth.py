@@ -0,0 +1,56 @@
+"""
+Microbenchmark: per-request Telegram auth overhead with and without the
+validated-initData cache.
+
+Reports the cost of authenticate() alone and the Supabase round trips a
+typical authenticated handler makes when the cache is cold or warm.
+
+Usage: python bench/bench_auth.py [--iterations 20000]
+"""
+
+import argparse
+import time
+
+from common import FakeSupabase, init_data, load_api, seed
+
+
+def time_per_call(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def run(iterations):
+    fake = FakeSupabase()
+    users = seed(fake, exams=20)
+    api = load_api(fake)
+    token = init_data(users[0]['telegram_id'])
+
+    def cold():
+        api.auth_cache.clear()
+        assert api.authenticate(token)
+
+    def warm():
+        assert api.authenticate(token)
+
+    print(f"authenticate() cold: {time_per_call(cold, iterations):8.2f} us/call")
+    print(f"authenticate() warm: {time_per_call(warm, iterations):8.2f} us/call")
+
+    client = api.app.test_client()
+    headers = {'X-Telegram-Auth': token}
+    for label, reset in (('cold', True), ('warm', False)):
+        if reset:
+            api.auth_cache.clear()
+        fake.reset_counters()
+        response = client.post(f"/api/exams/{fake.tables['exams'][0]['id']}/like", headers=headers)
+        assert response.status_code == 200, response.get_json()
+        print(f"POST /api/exams/<id>/like {label}: {fake.query_count} queries "
+              f"({fake.queries['select:users']} users lookups)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=20000)
+    args = parser.parse_args()
+    run(args.iterations)
@@ -0,0 +1,92 @@
+"""
+Benchmark: Supabase round trips during a burst of identical requests, with
+and without request coalescing (COALESCE_QUERIES).
+
+Simulates a channel posting the mini-app link: N users open it at the same
+moment, each loading the feed, universities and courses (cold reference
+cache), the poster's profile and the linked exam. Per-user parts (is_liked,
+is_following) are still one query per user; with coalescing the shared parts
+should cost one query per distinct query however many users arrive together.
+
+Usage: python bench/bench_coalesce.py [--users 10 50 200] [--latency-ms 20]
+"""
+
+import argparse
+import threading
+import time
+
+from common import FakeSupabase, init_data, install_functions, load_api, seed
+
+# Queries whose result depends on the reader
+PER_USER = ('select:exam_likes', 'select:follows')
+
+
+def burst(api, fake, users, headers, paths):
+    """Every user requests every path at once; returns (queries Counter, seconds)"""
+    api.invalidate_reference('universities')
+    api.invalidate_reference('courses')
+    fake.reset_counters()
+    barrier = threading.Barrier(len(users))
+    failures = []
+
+    def visit(user):
+        client = api.app.test_client()
+        barrier.wait()
+        for path in paths:
+            status = client.get(path, headers=headers[user['id']]).status_code
+            if status != 200:
+                failures.append((path, status))
+
+    threads = [threading.Thread(target=visit, args=(user,)) for user in users]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not failures, failures[:3]
+    return fake.queries.copy(), time.perf_counter() - start
+
+
+def run(user_counts, latency_ms):
+    fake = FakeSupabase()
+    users = seed(fake, users=max(user_counts) + 1, exams=300)
+    install_functions(fake)
+    api = load_api(fake)
+    api.auth_cache.maxsize = max(api.auth_cache.maxsize, len(users))
+    api.SLOW_REQUEST_MS = 0
+    poster = users[0]
+    exam_id = next(e['id'] for e in fake.tables['exams'] if e['user_id'] == poster['id'])
+    paths = [
+        '/api/exams?limit=20&view=card',
+        '/api/universities',
+        '/api/courses',
+        f"/api/user/profile/{poster['id']}",
+        f'/api/exams/{exam_id}',
+    ]
+
+    # Resolve every reader's users.id once so the burst only counts the handlers
+    headers = {user['id']: {'X-Telegram-Auth': init_data(user['telegram_id'])} for user in users}
+    warm = api.app.test_client()
+    for user in users:
+        warm.get('/api/exams?limit=1&feed_type=following', headers=headers[user['id']])
+
+    fake.latency = latency_ms / 1000
+    print(f"{len(paths)} requests per user, {latency_ms} ms per round trip")
+    print(f"{'users':>6} {'coalesce':>9} {'queries':>8} {'shared':>7} {'per-user':>9} {'wall ms':>8}")
+    for count in user_counts:
+        for enabled in (False, True):
+            api.COALESCE_QUERIES = enabled
+            queries, seconds = burst(api, fake, users[1:count + 1], headers, paths)
+            per_user = sum(n for label, n in queries.items() if label in PER_USER)
+            total = sum(queries.values())
+            print(f"{count:>6} {'on' if enabled else 'off':>9} {total:>8} {total - per_user:>7} {per_user:>9} "
+                  f"{seconds * 1000:>8.0f}")
+    print(f"calls served by an in-flight twin: {api.inflight.shared}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, nargs='+', default=[10, 50, 200])
+    parser.add_argument('--latency-ms', type=float, default=20)
+    args = parser.parse_args()
+    run(args.users, args.latency_ms)
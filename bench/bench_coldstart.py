@@ -0,0 +1,135 @@
+"""
+Cold-start budget: how long importing api/index.py takes in a fresh
+interpreter, how many modules it loads, and what the first requests cost.
+
+Each run starts a new Python process (as a cold Vercel invocation does),
+imports the API with `-X importtime`, then serves /api/health and a request
+with invalid auth. Neither may load the database stack (supabase, postgrest,
+httpx); the script then makes the first database call to show what the lazy
+client defers. The slowest imports of the median run are listed.
+
+Exits non-zero when the median import time or module count is over budget or
+when the health check or auth rejection loaded the database stack, so it can
+gate a deploy:
+
+    python bench/bench_coldstart.py --max-import-ms 300 --max-modules 300
+
+Usage: python bench/bench_coldstart.py [--runs 5] [--top 12]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+API = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'api')
+
+# Modules that only requests reaching Supabase should load
+DATABASE_STACK = ('supabase', 'postgrest', 'httpx', 'storage3', 'gotrue')
+
+PROBE = '''
+import json, sys, time
+sys.path.insert(0, {api!r})
+before = set(sys.modules)
+start = time.perf_counter()
+import index
+imported = time.perf_counter()
+modules = len(set(sys.modules) - before)
+client = index.app.test_client()
+health = client.get('/api/health').status_code
+health_ms = (time.perf_counter() - imported) * 1000
+start_auth = time.perf_counter()
+rejected = client.get('/api/exams', headers={{'X-Telegram-Auth': 'hash=invalid'}}).status_code
+rejected_ms = (time.perf_counter() - start_auth) * 1000
+stack = sorted({{m.split('.')[0] for m in sys.modules}} & set({stack!r}))
+start_db = time.perf_counter()
+index.supabase.table('exams')
+db_ms = (time.perf_counter() - start_db) * 1000
+print(json.dumps({{
+    'import_ms': (imported - start) * 1000,
+    'modules': modules,
+    'health': health,
+    'health_ms': health_ms,
+    'rejected': rejected,
+    'rejected_ms': rejected_ms,
+    'stack_loaded': stack,
+    'first_db_ms': db_ms,
+    'modules_after_db': len(set(sys.modules) - before),
+}}))
+'''
+
+
+def run_once():
+    """(result dict, [(cumulative us, name)] for direct imports of index)"""
+    env = dict(os.environ, BOT_TOKEN=os.environ.get('BOT_TOKEN', 'coldstart:token'))
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE.format(api=API, stack=DATABASE_STACK)],
+        capture_output=True, text=True, env=env, check=True,
+    )
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    return result, direct_imports(proc.stderr)
+
+
+def direct_imports(importtime):
+    """Imports made by index itself, from -X importtime output"""
+    lines = [line for line in importtime.splitlines() if line.startswith('import time:') and '|' in line]
+    entries = []
+    for line in lines:
+        _, cumulative, name = line.split('|')
+        if not cumulative.strip().isdigit():
+            continue
+        entries.append((len(name) - len(name.lstrip()), int(cumulative), name.strip()))
+    # importtime prints children before their parent; collect what precedes index
+    # at one level deeper than it, up to the previous top-level module
+    for i, (depth, _, name) in enumerate(entries):
+        if name == 'index':
+            children = []
+            for child_depth, cumulative, child in reversed(entries[:i]):
+                if child_depth <= depth:
+                    break
+                if child_depth == depth + 2:
+                    children.append((cumulative, child))
+            return sorted(children, reverse=True)
+    return []
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=12, help='slowest imports to list')
+    parser.add_argument('--max-import-ms', type=float, default=300)
+    parser.add_argument('--max-modules', type=int, default=300)
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    runs.sort(key=lambda r: r[0]['import_ms'])
+    median, imports = runs[len(runs) // 2]
+    times = [r[0]['import_ms'] for r in runs]
+
+    print(f"import index: median {median['import_ms']:.0f} ms (min {min(times):.0f}, max {max(times):.0f}) "
+          f"over {args.runs} cold processes, {median['modules']} modules")
+    print(f"first /api/health: {median['health_ms']:.1f} ms (status {median['health']}), "
+          f"invalid auth: {median['rejected_ms']:.1f} ms (status {median['rejected']})")
+    print(f"database stack loaded by then: {', '.join(median['stack_loaded']) or 'none'}")
+    print(f"first database call: +{median['first_db_ms']:.0f} ms, "
+          f"{median['modules_after_db'] - median['modules']} more modules")
+    print("\nslowest imports of index (cumulative):")
+    for cumulative, name in imports[:args.top]:
+        print(f"  {cumulative / 1000:>7.1f} ms  {name}")
+
+    problems = []
+    if statistics.median(times) > args.max_import_ms:
+        problems.append(f"import time {statistics.median(times):.0f} ms over budget {args.max_import_ms:.0f} ms")
+    if median['modules'] > args.max_modules:
+        problems.append(f"{median['modules']} modules over budget {args.max_modules}")
+    if any(r[0]['stack_loaded'] for r in runs):
+        problems.append('health check or auth rejection loaded the database stack')
+    print('\n' + ('\n'.join(f"OVER BUDGET {p}" for p in problems) if problems else 'within budget'))
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark: Supabase round trips for POST /api/exams as the page count grows.
+
+Runs once with the create_exam_with_files database function installed and
+once without it (batched insert fallback). Asserts that the round trips do
+not grow with the page count, that the function beats the fallback, and
+that a failing page insert leaves no exam or page rows behind.
+
+Usage: python bench/bench_create_exam.py [--pages 1 10 40]
+"""
+
+import argparse
+
+from common import FakeSupabase, init_data, install_functions, load_api, seed
+
+
+def create(fake, users, pages):
+    api = load_api(fake)
+    client = api.app.test_client()
+    headers = {'X-Telegram-Auth': init_data(users[0]['telegram_id'])}
+    client.get('/api/exams?limit=1', headers=headers)  # warm the auth cache
+    body = {
+        'university_id': fake.tables['universities'][0]['id'],
+        'course_id': fake.tables['courses'][0]['id'],
+        'year': 2023,
+        'exam_type': 'Final',
+        'files': [f'https://cdn.local/page{i}.jpg' for i in range(pages)],
+    }
+    fake.reset_counters()
+    return client.post('/api/exams', json=body, headers=headers)
+
+
+def fail_page_insert(client, op, row, old=None):
+    raise RuntimeError('page insert failed')
+
+
+def run(page_counts):
+    print(f"{'pages':>6} {'rpc':>8} {'batched':>8}")
+    baseline = None
+    for pages in page_counts:
+        counts = []
+        for with_rpc in (True, False):
+            fake = FakeSupabase()
+            users = seed(fake, exams=5)
+            if with_rpc:
+                install_functions(fake)
+            response = create(fake, users, pages)
+            assert response.status_code == 200, response.get_json()
+            exam_id = response.get_json()['exam']['id']
+            assert sum(f['exam_id'] == exam_id for f in fake.tables['exam_files']) == pages
+            counts.append(fake.query_count)
+        print(f"{pages:>6} {counts[0]:>8} {counts[1]:>8}")
+        baseline = baseline or counts
+        assert counts == baseline, f"round trips grew with {pages} pages: {counts} vs {baseline}"
+        assert counts[0] < counts[1], f"the database function should save round trips: {counts}"
+
+    fake = FakeSupabase()
+    users = seed(fake, exams=5)
+    exams_before, files_before = len(fake.tables['exams']), len(fake.tables['exam_files'])
+    fake.triggers['exam_files'].append(fail_page_insert)
+    try:
+        response = create(fake, users, 3)
+        assert response.status_code >= 500, response.get_json()
+    except RuntimeError:
+        pass
+    exams_left = len(fake.tables['exams']) - exams_before
+    files_left = len(fake.tables['exam_files']) - files_before
+    print(f"rows left after failed page insert: {exams_left} exams, {files_left} pages")
+    assert exams_left == 0 and files_left == 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 10, 40])
+    args = parser.parse_args()
+    run(args.pages)
@@ -0,0 +1,110 @@
+"""
+Benchmark: storage and transfer saved by content-hash deduplication, using
+a filesystem storage stand-in.
+
+Several users upload the same set of scanned pages (the usual "everyone
+shares the same exam" case). Clients that send the hash skip the transfer
+entirely; clients that don't are deduplicated on confirmation. Re-posting
+an identical exam is rejected with 409. Finally, pre-dedup data (one
+object per upload) is collapsed by `dedupe-files`.
+
+Usage: python bench/bench_dedup.py [--uploaders 8] [--pages 3] [--width 1500]
+"""
+
+import argparse
+import hashlib
+import os
+import tempfile
+
+from bench_media import phone_photo
+from common import FakeSupabase, init_data, install_functions, load_api, seed
+from local_storage import LocalStorage
+
+
+def stored_bytes(root):
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(root) for f in files)
+
+
+def stored_objects(root):
+    return sum(len(files) for _, _, files in os.walk(root))
+
+
+def upload(client, headers, storage, data, send_hash):
+    body = {'filename': 'page.jpg', 'content_type': 'image/jpeg'}
+    if send_hash:
+        body['sha256'] = hashlib.sha256(data).hexdigest()
+    response = client.post('/api/upload/url', json=body, headers=headers).get_json()
+    if response['exists']:
+        return response, 0
+    storage.from_('exams').upload(response['path'], data)
+    return client.post('/api/upload/confirm', json={'path': response['path']}, headers=headers).get_json(), len(data)
+
+
+def run(uploaders, pages, width):
+    scans = [phone_photo(width, p) for p in range(pages)]
+    with tempfile.TemporaryDirectory() as root:
+        fake = FakeSupabase()
+        users = seed(fake, users=uploaders, exams=0)
+        install_functions(fake)
+        storage = LocalStorage(root)
+        fake.storage = storage
+        api = load_api(fake)
+        client = api.app.test_client()
+        exam = {'university_id': fake.tables['universities'][0]['id'],
+                'course_id': fake.tables['courses'][0]['id'], 'year': 2024, 'exam_type': 'Final'}
+
+        sent = 0
+        statuses = []
+        for i, user in enumerate(users[:uploaders]):
+            headers = {'X-Telegram-Auth': init_data(user['telegram_id'])}
+            # Half the clients are older builds that don't send a hash
+            results = [upload(client, headers, storage, data, send_hash=i % 2 == 0) for data in scans]
+            sent += sum(n for _, n in results)
+            files = [{'file_url': r['url']} for r, _ in results]
+            statuses.append(client.post('/api/exams', headers=headers, json={**exam, 'files': files}).status_code)
+
+        naive = uploaders * sum(len(data) for data in scans)
+        print(f"{uploaders} users upload the same {pages} pages ({sum(map(len, scans)) / 1024:.0f} KiB)")
+        print(f"bytes uploaded:   {sent / 1024:>8.0f} KiB  (without dedup {naive / 1024:.0f} KiB)")
+        print(f"bytes stored:     {stored_bytes(root) / 1024:>8.0f} KiB  in {len(fake.tables['file_blobs'])} blobs")
+        print(f"create exam:      {statuses.count(200)} created, {statuses.count(409)} rejected as duplicates")
+        # The first client uploads every page; of the rest, only those without
+        # a hash (odd-numbered) transfer the pages again
+        assert sent == (1 + uploaders // 2) * sum(map(len, scans)), sent
+        assert statuses == [200] + [409] * (uploaders - 1), statuses
+        assert len(fake.tables['file_blobs']) == pages
+        assert len(fake.tables['exam_files']) == pages and all(f['sha256'] for f in fake.tables['exam_files'])
+        # One original plus its thumbnail and reading size per page
+        assert stored_objects(root) == 3 * pages, stored_objects(root)
+
+        # Data from before deduplication: one object (and derived sizes) per upload
+        fake.tables['file_blobs'].clear()
+        fake.tables['exam_files'].clear()
+        bucket = storage.from_('exams')
+        for i in range(uploaders):
+            for p, data in enumerate(scans):
+                path = f'legacy/{i}/page{p}.jpg'
+                bucket.upload(path, data)
+                fake.tables['exam_files'].append({'id': f'{i}-{p}', 'exam_id': f'legacy-{i}',
+                                                  'file_url': bucket.get_public_url(path), 'page_order': p})
+        before = stored_bytes(root)
+        done = api.dedupe_files()
+        print(f"dedupe-files:     hashed {done['hashed']}, collapsed {done['collapsed']} pages, "
+              f"removed {done['removed']} objects; {before / 1024:.0f} -> {stored_bytes(root) / 1024:.0f} KiB")
+        distinct = {row['file_url'] for row in fake.tables['exam_files']}
+        rerun = api.dedupe_files()
+        print(f"pages now point at {len(distinct)} distinct files; re-run: {rerun}")
+        duplicates = (uploaders - 1) * pages
+        assert done == {'hashed': uploaders * pages, 'collapsed': duplicates, 'removed': duplicates}, done
+        assert len(distinct) == pages and len(fake.tables['file_blobs']) == pages
+        assert stored_objects(root) == 3 * pages + pages, stored_objects(root)
+        assert rerun == {'hashed': 0, 'collapsed': 0, 'removed': 0}, rerun
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--uploaders', type=int, default=8)
+    parser.add_argument('--pages', type=int, default=3)
+    parser.add_argument('--width', type=int, default=1500, help='photo width in pixels')
+    args = parser.parse_args()
+    run(args.uploaders, args.pages, args.width)
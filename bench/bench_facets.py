@@ -0,0 +1,71 @@
+"""
+Benchmark: loading browse facet counts as the archive grows, summed by the
+exam_facet_counts function, by the API from the exam_facets rollup rows
+(without the function) and from the exam rows (without the table).
+
+Each data set gets the same requests: the whole archive, one university and
+one university's course grouped by year and exam type. The counts from all
+three paths are compared.
+
+Usage: python bench/bench_facets.py [--scales small medium] [--latency-ms 8]
+"""
+
+import argparse
+import time
+
+from common import SCALES, FakeSupabase, init_data, install_functions, load_api, seed_realistic
+
+
+def measure(api, fake, client, headers, path):
+    fake.reset_counters()
+    fake.measure_bytes = True
+    start = time.perf_counter()
+    response = client.get(path, headers=headers)
+    seconds = time.perf_counter() - start
+    fake.measure_bytes = False
+    assert response.status_code == 200, response.get_json()
+    return response.get_json(), fake.query_count, sum(fake.response_bytes.values()), seconds
+
+
+def run(scales, latency_ms):
+    print(f"{latency_ms:.0f} ms per Supabase round trip")
+    print(f"{'scale':<8} {'exams':>7} {'request':<12} {'source':<9} {'queries':>8} {'from db':>10} {'ms':>7}")
+    for scale in scales:
+        fake = FakeSupabase()
+        users = seed_realistic(fake, **SCALES[scale])
+        install_functions(fake)
+        api = load_api(fake)
+        client = api.app.test_client()
+        headers = {'X-Telegram-Auth': init_data(users[0]['telegram_id'])}
+        client.get('/api/universities', headers=headers)
+        exam = fake.tables['exams'][0]
+        requests = [
+            ('all', ''),
+            ('university', f"university_id={exam['university_id']}"),
+            ('course', f"university_id={exam['university_id']}&course_id={exam['course_id']}"
+                       f"&group_by=year,exam_type"),
+        ]
+        fake.latency = latency_ms / 1000
+        for name, query in requests:
+            results = []
+            for source in ('function', 'rollup', 'rows'):
+                if source != 'function':
+                    api.missing_rpcs.add('exam_facet_counts')
+                if source == 'rows':
+                    api.missing_tables.add('exam_facets')
+                body, queries, db_bytes, seconds = measure(api, fake, client, headers, f'/api/exams/facets?{query}')
+                api.missing_rpcs.discard('exam_facet_counts')
+                api.missing_tables.discard('exam_facets')
+                results.append(body)
+                print(f"{scale:<8} {len(fake.tables['exams']):>7} {name:<12} {source:<9} {queries:>8} "
+                      f"{db_bytes:>10,} {seconds * 1000:>7.0f}")
+            assert results[0] == results[1] == results[2], f'{name}: counts differ between paths'
+        fake.latency = 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scales', nargs='+', choices=SCALES, default=['small', 'medium'])
+    parser.add_argument('--latency-ms', type=float, default=8)
+    args = parser.parse_args()
+    run(args.scales, args.latency_ms)
@@ -0,0 +1,36 @@
+"""
+Benchmark: Supabase round trips and latency for GET /api/exams as the
+number of exams on the page grows.
+
+Usage: python bench/bench_feed.py [--latency 0.002]
+"""
+
+import argparse
+import time
+
+from common import FakeSupabase, init_data, load_api, seed
+
+
+def run(sizes, latency):
+    print(f"{'exams':>6} {'queries':>8} {'ms':>8}")
+    for size in sizes:
+        fake = FakeSupabase(latency=latency)
+        users = seed(fake, exams=size)
+        api = load_api(fake)
+        client = api.app.test_client()
+        headers = {'X-Telegram-Auth': init_data(users[0]['telegram_id'])}
+
+        fake.reset_counters()
+        start = time.perf_counter()
+        response = client.get(f'/api/exams?limit={size}', headers=headers)
+        elapsed = (time.perf_counter() - start) * 1000
+        assert response.status_code == 200, response.get_json()
+        print(f"{len(response.get_json()['exams']):>6} {fake.query_count:>8} {elapsed:>8.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--latency', type=float, default=0.002, help='simulated seconds per round trip')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 50, 100])
+    args = parser.parse_args()
+    run(args.sizes, args.latency)
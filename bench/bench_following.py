@@ -0,0 +1,55 @@
+"""
+Benchmark: GET /api/exams?feed_type=following for users who follow 10,
+1,000 and 10,000 accounts, with the following_exams database join versus
+the old follow-list IN (...) filter.
+
+The IN path puts every followed id in the request URL; its size is shown
+because PostgREST/proxies reject URLs beyond a few KB.
+
+Usage: python bench/bench_following.py [--follows 10 1000 10000]
+"""
+
+import argparse
+import time
+import uuid
+
+from common import FakeSupabase, init_data, install_functions, load_api, seed
+
+
+def build(follows, with_rpc, latency):
+    fake = FakeSupabase(latency=latency)
+    users = seed(fake, users=follows + 1, exams=max(200, follows), follows_per_user=0)
+    reader = users[0]
+    fake.seed('follows', [{'follower_id': reader['id'], 'following_id': u['id'], 'created_at': u['created_at']}
+                          for u in users[1:]])
+    if with_rpc:
+        install_functions(fake)
+    return fake, reader
+
+
+def run(follow_counts, latency):
+    print(f"{'follows':>8} {'path':>6} {'queries':>8} {'in_ URL bytes':>14} {'ms':>8} {'exams':>6}")
+    for follows in follow_counts:
+        for with_rpc in (True, False):
+            fake, reader = build(follows, with_rpc, latency)
+            api = load_api(fake)
+            client = api.app.test_client()
+            headers = {'X-Telegram-Auth': init_data(reader['telegram_id'])}
+            client.get('/api/exams?limit=1', headers=headers)  # warm the auth cache
+
+            fake.reset_counters()
+            start = time.perf_counter()
+            response = client.get('/api/exams?feed_type=following&limit=20', headers=headers)
+            elapsed = (time.perf_counter() - start) * 1000
+            assert response.status_code == 200, response.get_json()
+            url_bytes = 0 if with_rpc else len('user_id=in.()') + follows * (len(str(uuid.uuid4())) + 1)
+            print(f"{follows:>8} {'rpc' if with_rpc else 'in_':>6} {fake.query_count:>8} {url_bytes:>14} "
+                  f"{elapsed:>8.1f} {len(response.get_json()['exams']):>6}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--follows', type=int, nargs='+', default=[10, 1000, 10000])
+    parser.add_argument('--latency', type=float, default=0.005, help='simulated seconds per round trip')
+    args = parser.parse_args()
+    run(args.follows, args.latency)
@@ -0,0 +1,106 @@
+"""
+Benchmark: image bytes a client downloads per feed view before and after
+upload processing, using a filesystem storage stand-in.
+
+Synthetic phone photos are uploaded through /api/upload/url and
+/api/upload/confirm, exams are created with the returned URLs, and one
+feed page is measured: the card image is the original upload versus the
+WebP thumbnail. The viewer's page size (original vs reading size) and the
+optional merged PDF are reported as well.
+
+Usage: python bench/bench_media.py [--exams 10] [--pages 3] [--width 3000]
+"""
+
+import argparse
+import io
+import random
+import tempfile
+import time
+
+from PIL import Image, ImageDraw
+
+from common import FakeSupabase, init_data, install_functions, load_api, seed
+from local_storage import LocalStorage
+
+
+def phone_photo(width, seed_value):
+    """A JPEG resembling a photographed exam page: paper, text lines, sensor noise"""
+    rng = random.Random(seed_value)
+    height = width * 4 // 3
+    image = Image.new('RGB', (width, height), (236, 233, 224))
+    draw = ImageDraw.Draw(image)
+    for y in range(height // 20, height - height // 20, max(12, height // 60)):
+        x = width // 12
+        while x < width - width // 12:
+            word = rng.randint(width // 60, width // 15)
+            draw.rectangle([x, y, x + word, y + max(3, height // 250)], fill=(40, 40, 48))
+            x += word + width // 80
+    noise = Image.effect_noise((width, height), 18).convert('RGB')
+    image = Image.blend(image, noise, 0.12)
+    out = io.BytesIO()
+    image.save(out, 'JPEG', quality=90)
+    return out.getvalue()
+
+
+def upload(client, headers, storage, data, name):
+    response = client.post('/api/upload/url', json={'filename': name, 'content_type': 'image/jpeg'},
+                           headers=headers).get_json()
+    storage.from_('exams').upload(response['path'], data)
+    return client.post('/api/upload/confirm', json={'path': response['path']}, headers=headers).get_json()
+
+
+def run(exams, pages, width):
+    with tempfile.TemporaryDirectory() as root:
+        fake = FakeSupabase()
+        users = seed(fake, users=5, exams=0)
+        install_functions(fake)
+        storage = LocalStorage(root)
+        fake.storage = storage
+        api = load_api(fake)
+        client = api.app.test_client()
+        headers = {'X-Telegram-Auth': init_data(users[0]['telegram_id'])}
+
+        confirm_ms = []
+        for e in range(exams):
+            files = []
+            for p in range(pages):
+                start = time.perf_counter()
+                files.append(upload(client, headers, storage, phone_photo(width, e * pages + p), f'page{p}.jpg'))
+                confirm_ms.append((time.perf_counter() - start) * 1000)
+            client.post('/api/exams', headers=headers, json={
+                'university_id': fake.tables['universities'][0]['id'],
+                'course_id': fake.tables['courses'][0]['id'],
+                'year': 2024, 'exam_type': 'Final',
+                'files': [{'file_url': f['url']} for f in files],
+            })
+
+        feed = client.get(f'/api/exams?limit={exams}', headers=headers).get_json()['exams']
+        cards = [exam['files'][0] for exam in feed]
+        original = sum(storage.size_of(f['file_url']) for f in cards)
+        thumbs = sum(storage.size_of(f['thumbnail_url']) for f in cards)
+        pages_all = [f for exam in feed for f in exam['files']]
+        full = sum(storage.size_of(f['file_url']) for f in pages_all)
+        reading = sum(storage.size_of(f['preview_url']) for f in pages_all)
+
+        start = time.perf_counter()
+        done = api.process_uploads(pdf=True)
+        pdf_ms = (time.perf_counter() - start) * 1000
+        pdf_sizes = [storage.size_of(e['pdf_url']) for e in fake.tables['exams'] if e.get('pdf_url')]
+
+        print(f"{exams} exams x {pages} pages, {width}px photos; confirm+process p50 "
+              f"{sorted(confirm_ms)[len(confirm_ms) // 2]:.0f} ms/page")
+        print(f"feed view (card images):  original {original / 1024:>9.0f} KiB   "
+              f"thumbnails {thumbs / 1024:>7.0f} KiB   ({original / thumbs:.0f}x less)")
+        print(f"exam pages (viewer):      original {full / 1024:>9.0f} KiB   "
+              f"reading    {reading / 1024:>7.0f} KiB   ({full / reading:.0f}x less)")
+        print(f"merged PDFs: {done['pdfs']} in {pdf_ms:.0f} ms, "
+              f"avg {sum(pdf_sizes) / max(1, len(pdf_sizes)) / 1024:.0f} KiB")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--exams', type=int, default=10)
+    parser.add_argument('--pages', type=int, default=3)
+    parser.add_argument('--width', type=int, default=3000, help='photo width in pixels')
+    args = parser.parse_args()
+    run(args.exams, args.pages, args.width)
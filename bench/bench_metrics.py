@@ -0,0 +1,110 @@
+"""
+Benchmark: per-route Supabase round trips and timings as reported by the
+request instrumentation (api/_metrics.py), plus the overhead the
+instrumentation adds to a request.
+
+Each route is called a number of times against the in-memory stand-in
+with simulated latency; the table is built from /api/metrics, so it shows
+exactly what production scrapes would show. Routes whose query count grows
+with page size (N+1 patterns) stand out in the "queries/req" column;
+"db ms" sums round trips, so it exceeds wall time when queries run in parallel.
+
+Usage: python bench/bench_metrics.py [--latency-ms 5] [--calls 20]
+"""
+
+import argparse
+import re
+import statistics
+import time
+
+from common import FakeSupabase, init_data, install_functions, load_api, seed
+
+
+def parse(text):
+    """{(metric, frozenset(labels)): value} from Prometheus text"""
+    samples = {}
+    for line in text.splitlines():
+        match = re.match(r'^(\w+)(?:\{(.*)\})? (\S+)$', line)
+        if match:
+            labels = frozenset(re.findall(r'(\w+)="([^"]*)"', match.group(2) or ''))
+            samples[(match.group(1), labels)] = float(match.group(3))
+    return samples
+
+
+def overhead(api, client, headers, calls=300):
+    """Median wall time of a cheap request with and without the hooks"""
+    def median():
+        times = []
+        for _ in range(calls):
+            start = time.perf_counter()
+            client.get('/api/health', headers=headers)
+            times.append(time.perf_counter() - start)
+        return statistics.median(times) * 1e6
+
+    instrumented = median()
+    before, after = api.app.before_request_funcs[None], api.app.after_request_funcs[None]
+    api.app.before_request_funcs[None] = [f for f in before if f is not api.start_trace]
+    api.app.after_request_funcs[None] = [f for f in after if f is not api.finish_trace]
+    try:
+        bare = median()
+    finally:
+        api.app.before_request_funcs[None], api.app.after_request_funcs[None] = before, after
+    return instrumented, bare
+
+
+def run(latency_ms, calls):
+    fake = FakeSupabase()
+    users = seed(fake, users=50, exams=300)
+    install_functions(fake)
+    api = load_api(fake)
+    client = api.app.test_client()
+    headers = {'X-Telegram-Auth': init_data(users[0]['telegram_id'])}
+    exam_id = fake.tables['exams'][0]['id']
+
+    # Warm the auth and reference caches, then start counting
+    client.get('/api/universities', headers=headers)
+    api.request_metrics.reset()
+    fake.latency = latency_ms / 1000
+
+    paths = [
+        '/api/exams?limit=20',
+        '/api/exams?limit=20&feed_type=following',
+        f'/api/exams/{exam_id}',
+        f"/api/user/profile/{users[1]['id']}",
+        '/api/user/profile',
+        '/api/universities',
+    ]
+    for path in paths:
+        for _ in range(calls):
+            client.get(path, headers=headers)
+    fake.latency = 0
+
+    samples = parse(client.get('/api/metrics').get_data(as_text=True))
+    routes = sorted({dict(labels)['route'] for (name, labels) in samples if name == 'fetenahub_request_queries_count'})
+    print(f"{calls} calls per path, {latency_ms} ms simulated Supabase latency")
+    print(f"{'route':<34} {'reqs':>5} {'avg ms':>7} {'db ms':>7} {'queries/req':>12}  top query")
+    for route in routes:
+        if route == '/api/metrics':
+            continue
+        key = frozenset({('route', route)})
+        count = samples[('fetenahub_request_queries_count', key)]
+        queries = samples[('fetenahub_request_queries_sum', key)]
+        wall = samples[('fetenahub_request_duration_seconds_sum', key)]
+        per_query = {dict(labels)['query']: value for (name, labels), value in samples.items()
+                     if name == 'fetenahub_supabase_query_seconds_total' and dict(labels)['route'] == route}
+        db = sum(per_query.values())
+        top = max(per_query, key=per_query.get) if per_query else '-'
+        print(f"{route:<34} {count:>5.0f} {wall / count * 1000:>7.1f} {db / count * 1000:>7.1f} "
+              f"{queries / count:>12.1f}  {top}")
+
+    instrumented, bare = overhead(api, client, headers)
+    print(f"instrumentation overhead on /api/health: {instrumented:.0f} us vs {bare:.0f} us "
+          f"(+{instrumented - bare:.0f} us)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--latency-ms', type=float, default=5)
+    parser.add_argument('--calls', type=int, default=20)
+    args = parser.parse_args()
+    run(args.latency_ms, args.calls)
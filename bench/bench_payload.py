@@ -0,0 +1,70 @@
+"""
+Benchmark: bytes per exam-list page with full exams, the card view and a
+minimal fields= list, before and after response compression, and the
+bytes Supabase returns to the API for each (measured by the in-memory
+stand-in as the JSON size of every round trip).
+
+Brotli is included when the brotli package is installed.
+
+Usage: python bench/bench_payload.py [--limit 20] [--pages 6]
+"""
+
+import argparse
+
+from common import FakeSupabase, init_data, install_functions, load_api, seed
+
+VARIANTS = [
+    ('full', ''),
+    ('card', '&view=card'),
+    ('ids+year', '&fields=id,year,likes_count'),
+]
+
+FEEDS = [
+    ('feed', ''),
+    ('following', '&feed_type=following'),
+    ('search', '&search=Teacher'),
+]
+
+
+def wire_size(client, path, headers, encoding):
+    response = client.get(path, headers={**headers, 'Accept-Encoding': encoding})
+    assert response.status_code == 200, (path, response.status_code)
+    return len(response.data)
+
+
+def run(limit, pages):
+    fake = FakeSupabase()
+    users = seed(fake, users=50, exams=400, pages=pages)
+    install_functions(fake)
+    api = load_api(fake)
+    api.COMPRESS_RESPONSES = True
+    api.COMPRESS_MIN_SIZE = 0
+    client = api.app.test_client()
+    headers = {'X-Telegram-Auth': init_data(users[0]['telegram_id'])}
+    client.get('/api/universities', headers=headers)
+    encodings = ['identity', 'gzip'] + (['br'] if api.brotli_module() else [])
+
+    print(f"limit={limit}, {pages} pages per exam; bytes per response")
+    print(f"{'feed':<10} {'variant':<9} " + ' '.join(f'{e:>9}' for e in encodings) + f" {'from db':>9} {'queries':>8}")
+    for feed, feed_query in FEEDS:
+        full = None
+        for variant, variant_query in VARIANTS:
+            path = f'/api/exams?limit={limit}{feed_query}{variant_query}'
+            fake.reset_counters()
+            fake.measure_bytes = True
+            client.get(path, headers=headers)
+            fake.measure_bytes = False
+            db_bytes = sum(fake.response_bytes.values())
+            queries = fake.query_count
+            sizes = [wire_size(client, path, headers, encoding) for encoding in encodings]
+            full = full or sizes[0]
+            print(f"{feed:<10} {variant:<9} " + ' '.join(f'{s:>9,}' for s in sizes) +
+                  f" {db_bytes:>9,} {queries:>8}   ({sizes[0] / full:.0%} of full)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--pages', type=int, default=6, help='pages per seeded exam')
+    args = parser.parse_args()
+    run(args.limit, args.pages)
@@ -0,0 +1,134 @@
+"""
+Benchmark: per-user rate limits and load shedding.
+
+Abuse: one client loops over search requests while normal users search a
+few times each, against two API instances. With the in-memory store each
+instance keeps its own buckets, so the abuser gets a burst from each; with
+the Redis store (the in-memory stand-in, running a Python version of the
+token-bucket script) the instances share them.
+
+Shedding: Supabase slows down past the latency budget for a while, then
+recovers. Searches get 503 with Retry-After while the p90 round trip is over
+budget and go through again once the slow samples leave the window; the
+cheap feed keeps being served throughout.
+
+Usage: python bench/bench_ratelimit.py [--abuse 300] [--users 20] [--limit search=30/60]
+"""
+
+import argparse
+import time
+from collections import Counter
+
+from common import FakeSupabase, init_data, install_functions, load_api, seed
+from fake_redis import FakeRedis
+
+
+def token_bucket(redis, keys, args):
+    """Python version of _ratelimit.TOKEN_BUCKET_SCRIPT for FakeRedis"""
+    from _ratelimit import refill
+    rate, burst, now, cost = map(float, args)
+    tokens, updated = redis._data.get(keys[0], (burst, now))
+    allowed, tokens, wait = refill(tokens, updated, now, rate, burst, cost)
+    redis._data[keys[0]] = (tokens, now)
+    return [int(allowed), str(wait)]
+
+
+def instances(store, limits):
+    """Two rate limiters as two API instances would have them"""
+    from _ratelimit import TOKEN_BUCKET_SCRIPT, MemoryBucketStore, RateLimiter, RedisBucketStore
+    if store == 'memory':
+        return [RateLimiter(MemoryBucketStore(), limits) for _ in range(2)]
+    redis = FakeRedis()
+    redis.scripts[TOKEN_BUCKET_SCRIPT] = token_bucket
+    shared = RedisBucketStore(redis)
+    return [RateLimiter(shared, limits) for _ in range(2)]
+
+
+def abuse(api, users, abuse_requests, store, limits):
+    client = api.app.test_client()
+    limiters = instances(store, limits)
+    abuser = {'X-Telegram-Auth': init_data(users[0]['telegram_id'])}
+    normal = [{'X-Telegram-Auth': init_data(user['telegram_id'])} for user in users[1:]]
+    statuses = {'abuser': Counter(), 'normal': Counter()}
+    retry_after = []
+    start = time.perf_counter()
+    for i in range(abuse_requests):
+        api.rate_limiter = limiters[i % 2]
+        response = client.get(f'/api/exams?limit=10&view=card&search=exam{i}', headers=abuser)
+        statuses['abuser'][response.status_code] += 1
+        if response.status_code == 429:
+            retry_after.append(int(response.headers['Retry-After']))
+        if i % (abuse_requests // 10 or 1) == 0:
+            for j, headers in enumerate(normal):
+                api.rate_limiter = limiters[j % 2]
+                status = client.get('/api/exams?limit=10&view=card&search=Teacher', headers=headers).status_code
+                statuses['normal'][status] += 1
+    seconds = time.perf_counter() - start
+    rejected = sum(sum(limiter.rejected.values()) for limiter in limiters)
+    return statuses, retry_after, rejected, seconds
+
+
+def shedding(api, fake, users, slow_ms, fast_ms, budget_ms, window):
+    client = api.app.test_client()
+    headers = [{'X-Telegram-Auth': init_data(user['telegram_id'])} for user in users]
+    api.load_shedder.budget = budget_ms / 1000
+    api.load_shedder.window = window
+    api.load_shedder.min_samples = 5
+    phases = [('fast', fast_ms, window), ('slow', slow_ms, window * 1.5), ('recovered', fast_ms, window * 2)]
+    print(f"budget {budget_ms:.0f} ms, window {window:.1f} s; search / feed statuses per {window / 2:.1f} s")
+    print(f"{'phase':<10} {'t':>5} {'search 200':>11} {'search 503':>11} {'feed 200':>9} {'p90 ms':>8}")
+    start = time.perf_counter()
+    for phase, latency_ms, duration in phases:
+        fake.latency = latency_ms / 1000
+        phase_end = time.perf_counter() + duration
+        while time.perf_counter() < phase_end:
+            tick_end = min(phase_end, time.perf_counter() + window / 2)
+            search, feed = Counter(), Counter()
+            i = 0
+            while time.perf_counter() < tick_end:
+                user = headers[i % len(headers)]
+                search[client.get(f'/api/exams?limit=5&view=card&search=Teacher{i % 7}', headers=user).status_code] += 1
+                feed[client.get('/api/exams?limit=5&view=card', headers=user).status_code] += 1
+                i += 1
+            p90 = api.load_shedder.p90()
+            print(f"{phase:<10} {time.perf_counter() - start:>5.1f} {search[200]:>11} {search[503]:>11} "
+                  f"{feed[200]:>9} {'-' if p90 is None else f'{p90 * 1000:.0f}':>8}")
+    print(f"shed requests: {api.load_shedder.shed}")
+
+
+def run(abuse_requests, user_count, limit, slow_ms, fast_ms, budget_ms, window):
+    from _ratelimit import parse_limits
+    fake = FakeSupabase()
+    users = seed(fake, users=user_count + 1, exams=300)
+    install_functions(fake)
+    api = load_api(fake)
+    api.SLOW_REQUEST_MS = 0
+    limits = parse_limits(limit)
+
+    print(f"{limit}; abuser sends {abuse_requests} searches across 2 instances, "
+          f"{user_count} normal users search {10 * user_count} times")
+    print(f"{'store':<7} {'abuser 200':>11} {'abuser 429':>11} {'normal 200':>11} {'normal 429':>11} "
+          f"{'retry-after s':>14} {'ms':>6}")
+    for store in ('memory', 'redis'):
+        statuses, retry_after, rejected, seconds = abuse(api, users, abuse_requests, store, limits)
+        assert rejected == statuses['abuser'][429] + statuses['normal'][429]
+        waits = f"{min(retry_after)}-{max(retry_after)}" if retry_after else '-'
+        print(f"{store:<7} {statuses['abuser'][200]:>11} {statuses['abuser'][429]:>11} "
+              f"{statuses['normal'][200]:>11} {statuses['normal'][429]:>11} {waits:>14} {seconds * 1000:>6.0f}")
+    print()
+
+    api.rate_limiter.limits = {}
+    shedding(api, fake, users[1:], slow_ms, fast_ms, budget_ms, window)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--abuse', type=int, default=300, help='searches sent by the abusive client')
+    parser.add_argument('--users', type=int, default=20, help='normal users')
+    parser.add_argument('--limit', default='search=30/60')
+    parser.add_argument('--slow-ms', type=float, default=40, help='Supabase latency while degraded')
+    parser.add_argument('--fast-ms', type=float, default=2)
+    parser.add_argument('--budget-ms', type=float, default=20)
+    parser.add_argument('--window', type=float, default=2, help='shedding window, seconds')
+    args = parser.parse_args()
+    run(args.abuse, args.users, args.limit, args.slow_ms, args.fast_ms, args.budget_ms, args.window)
@@ -0,0 +1,83 @@
+"""
+Benchmark: reference data caching for /api/universities and /api/courses.
+
+Shows Supabase round trips for cold, warm and If-None-Match (304) requests,
+invalidation after create_course, and coherence of two API instances that
+share one Redis-compatible stand-in.
+
+Usage: python bench/bench_reference.py
+"""
+
+from common import FakeSupabase, init_data, load_api, seed
+from _cache import RedisBackend
+from fake_redis import FakeRedis
+
+
+def run():
+    fake = FakeSupabase()
+    users = seed(fake, exams=5)
+    api = load_api(fake)
+    api.reference_cache = RedisBackend(FakeRedis())
+    client = api.app.test_client()
+    headers = {'X-Telegram-Auth': init_data(users[0]['telegram_id'])}
+
+    def get(url, extra=None):
+        fake.reset_counters()
+        response = client.get(url, headers={**headers, **(extra or {})})
+        return response, fake.query_count
+
+    cold, cold_queries = get('/api/courses')
+    warm, warm_queries = get('/api/courses')
+    etag = warm.headers['ETag']
+    not_modified, nm_queries = get('/api/courses', {'If-None-Match': etag})
+    print(f"cold:         {cold.status_code} {cold_queries} queries, {len(cold.data)} bytes")
+    print(f"warm:         {warm.status_code} {warm_queries} queries, {len(warm.data)} bytes")
+    print(f"If-None-Match:{not_modified.status_code} {nm_queries} queries, {len(not_modified.data)} bytes")
+    assert cold.status_code == 200 and cold_queries == 1, (cold.status_code, cold_queries)
+    assert warm.status_code == 200 and warm_queries == 0 and warm.data == cold.data
+    assert not_modified.status_code == 304 and nm_queries == 0 and not not_modified.data
+    assert not_modified.headers['ETag'] == etag
+
+    # A second instance sharing the same Redis sees the invalidation
+    shared = api.reference_cache
+    client.post('/api/courses', json={'name': 'Linear Algebra'}, headers=headers)
+    other = RedisBackend(shared.client)
+    api.reference_cache = other
+    after, after_queries = get('/api/courses', {'If-None-Match': etag})
+    names = [c['name'] for c in after.get_json()['courses']]
+    print(f"after create: {after.status_code} {after_queries} queries, new course listed: {'Linear Algebra' in names}")
+    assert after.status_code == 200 and after_queries == 1 and 'Linear Algebra' in names
+    assert after.headers['ETag'] != etag
+
+    # A body loaded across an invalidation is served once but never cached:
+    # a course another instance creates mid-load shows up on the next request
+    table = api.supabase.table
+    created = []
+
+    def create_during_load(name):
+        query = table(name)
+        if name == 'courses' and not created:
+            read = query.execute
+
+            def execute():
+                rows = read()
+                created.append(table('courses').insert({'name': 'Topology'}).execute())
+                api.invalidate_reference('courses')
+                return rows
+            query.execute = execute
+        return query
+
+    api.invalidate_reference('courses')
+    api.supabase.table = create_during_load
+    raced, _ = get('/api/courses')
+    api.supabase.table = table
+    raced_names = [c['name'] for c in raced.get_json()['courses']]
+    fresh, fresh_queries = get('/api/courses')
+    fresh_names = [c['name'] for c in fresh.get_json()['courses']]
+    print(f"raced load:   {raced.status_code}, new course listed: {'Topology' in raced_names}; "
+          f"next request: {fresh_queries} queries, new course listed: {'Topology' in fresh_names}")
+    assert created and 'Topology' not in raced_names
+    assert fresh_queries == 1 and 'Topology' in fresh_names
+
+if __name__ == '__main__':
+    run()
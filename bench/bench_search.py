@@ -0,0 +1,87 @@
+"""
+Benchmark: GET /api/exams?search= with each search backend.
+
+The Postgres backend runs against the Python version of the search_exams
+SQL function; the in-process index is built from the same data. For each
+backend this reports round trips and latency per search, paging through
+every result, and asserts the results match a plain scan of the tables
+with that backend's matching rule: the phrase as a substring of the exam's
+search text or every word as a whole token for search_exams, every word as
+a substring for the index.
+
+Usage: python bench/bench_search.py [--exams 1000 5000]
+"""
+
+import argparse
+import re
+import time
+
+from common import FakeSupabase, init_data, install_functions, load_api, seed
+
+QUERIES = ['calc', 'physics', 'bahir', 'teacher 3', 'user1']
+
+
+def documents(fake):
+    """Yield (exam id, [field values]) straight from the tables"""
+    names = {t: {r['id']: r.get('name') or r.get('username') for r in fake.tables[t]}
+             for t in ('users', 'universities', 'courses')}
+    for exam in fake.tables['exams']:
+        yield exam['id'], [names['courses'].get(exam['course_id']), names['users'].get(exam['user_id']),
+                           names['universities'].get(exam['university_id']), exam.get('teacher_name')]
+
+
+def ilike_ids(fake, text):
+    """Exams search_exams must return: the phrase in the search text or every word as a token"""
+    needle, words = text.lower(), text.lower().split()
+    ids = set()
+    for exam_id, fields in documents(fake):
+        document = ' '.join(filter(None, fields)).lower()
+        if needle in document or all(w in re.findall(r'\w+', document) for w in words):
+            ids.add(exam_id)
+    return ids
+
+
+def substring_ids(fake, text):
+    """Exams the in-process index must return: every word somewhere in the document"""
+    words = text.lower().split()
+    return {exam_id for exam_id, fields in documents(fake)
+            if all(w in ' '.join(filter(None, fields)).lower() for w in words)}
+
+
+def run(sizes):
+    from _search import InvertedIndexSearch, PostgresSearch
+    backends = [('postgres', PostgresSearch, ilike_ids), ('memory', InvertedIndexSearch, substring_ids)]
+    print(f"{'exams':>6} {'backend':>9} {'query':>10} {'hits':>6} {'queries':>8} {'ms':>8}")
+    for size in sizes:
+        fake = FakeSupabase()
+        users = seed(fake, exams=size)
+        install_functions(fake)
+        api = load_api(fake)
+        client = api.app.test_client()
+        headers = {'X-Telegram-Auth': init_data(users[0]['telegram_id'])}
+
+        for name, backend, expected in backends:
+            api.search_backend = backend()
+            client.get('/api/exams?search=warmup', headers=headers)
+            for text in QUERIES:
+                found, cursor = [], None
+                fake.reset_counters()
+                start = time.perf_counter()
+                while True:
+                    url = f'/api/exams?limit=100&search={text}' + (f'&cursor={cursor}' if cursor else '')
+                    body = client.get(url, headers=headers).get_json()
+                    found += [e['id'] for e in body['exams']]
+                    cursor = body['next_cursor']
+                    if not cursor:
+                        break
+                elapsed = (time.perf_counter() - start) * 1000
+                assert len(found) == len(set(found)), f"{name} returned duplicates for {text!r}"
+                assert set(found) == expected(fake, text), f"{name} results differ from the scan for {text!r}"
+                print(f"{size:>6} {name:>9} {text:>10} {len(found):>6} {fake.query_count:>8} {elapsed:>8.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--exams', type=int, nargs='+', default=[1000, 5000])
+    args = parser.parse_args()
+    run(args.exams)
@@ -0,0 +1,215 @@
+"""
+Benchmark: peak Python memory of backend/app.py's PUT /upload/stream for
+large synthetic PDFs, against an in-process stand-in for Storage's
+resumable (TUS) endpoint. Peak memory must stay within a few chunks
+whatever the file size; the stand-in also fails some chunks to exercise
+resuming, and checks that the stored bytes hash to what was sent. The
+upload limit is raised to MAX_UPLOAD_MB (1024 here) so the large sizes are
+streamed rather than refused.
+
+Usage: python bench/bench_stream_upload.py [--sizes 16 128 512] [--fail-every 7]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import tracemalloc
+from urllib.parse import urlencode
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'backend'))
+
+BOT_TOKEN = 'bench:token'
+os.environ.setdefault('SUPABASE_URL', 'https://bench.supabase.co')
+os.environ.setdefault('SUPABASE_ANON_KEY', 'eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.bench')
+os.environ.setdefault('TELEGRAM_BOT_TOKEN', BOT_TOKEN)
+os.environ.setdefault('MAX_UPLOAD_MB', '1024')
+
+import app as backend  # noqa: E402
+import uploads  # noqa: E402
+
+MB = 1024 * 1024
+
+# A chunk being read, the one being sent, the join of a chunk read in
+# pieces and a resent tail, plus interpreter/test-client overhead
+PEAK_BUDGET = 4 * uploads.CHUNK_SIZE + 8 * MB
+
+
+class SyntheticPDF:
+    """Readable stream of `size` bytes starting with a PDF header, generated on demand"""
+
+    def __init__(self, size):
+        self.size = size
+        self.position = 0
+        self.digest = hashlib.sha256()
+        self._block = b'%PDF-1.7\n' + bytes(range(256)) * 256
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=0):
+        # Only the rewinds Werkzeug's test client performs before reading
+        self.position = self.size if whence == 2 else offset
+        return self.position
+
+    def read(self, n=-1):
+        n = self.size - self.position if n is None or n < 0 else min(n, self.size - self.position)
+        # Joined from references to one block so a read allocates only its result
+        block = self._block
+        start = self.position % len(block)
+        head = block[start:start + n]
+        whole, rest = divmod(n - len(head), len(block))
+        data = b''.join([head] + [block] * whole + [block[:rest]])
+        self.position += len(data)
+        self.digest.update(data)
+        return data
+
+
+class TusServer:
+    """Just enough of the TUS protocol for Storage's /upload/resumable"""
+
+    def __init__(self, fail_every=0):
+        self.fail_every = fail_every
+        self.uploads = {}
+        self.patches = 0
+        self.simple = {}
+
+    def handle(self, request):
+        if request.method == 'POST' and request.url.path.endswith('/upload/resumable'):
+            upload_id = f'u{len(self.uploads)}'
+            self.uploads[upload_id] = {'length': int(request.headers['Upload-Length']),
+                                       'offset': 0, 'digest': hashlib.sha256()}
+            return httpx.Response(201, headers={'Location': f'https://bench.supabase.co/storage/v1/upload/resumable/{upload_id}'})
+        upload = self.uploads.get(request.url.path.rsplit('/', 1)[-1])
+        if request.method == 'HEAD':
+            return httpx.Response(200, headers={'Upload-Offset': str(upload['offset'])})
+        if request.method == 'PATCH':
+            self.patches += 1
+            if int(request.headers['Upload-Offset']) != upload['offset']:
+                return httpx.Response(409)
+            assert 'chunked' not in request.headers.get('Transfer-Encoding', '')
+            length = int(request.headers['Content-Length'])
+            if self.fail_every and self.patches % self.fail_every == 0:
+                # Connection dropped after half the chunk was stored
+                length //= 2
+            received = 0
+            for part in request.stream:
+                part = part[:length - received]
+                upload['digest'].update(part)
+                received += len(part)
+            upload['offset'] += received
+            if received < int(request.headers['Content-Length']):
+                raise httpx.ReadError('connection reset')
+            return httpx.Response(204, headers={'Upload-Offset': str(upload['offset'])})
+        return httpx.Response(404)
+
+
+class StreamingTransport(httpx.BaseTransport):
+    """Like httpx.MockTransport, but without reading the whole request body first"""
+
+    def __init__(self, handler):
+        self.handler = handler
+
+    def handle_request(self, request):
+        return self.handler(request)
+
+
+class StandInBucket:
+    def __init__(self, server):
+        self.server = server
+
+    def upload(self, path, data, file_options=None):
+        self.server.simple[path] = hashlib.sha256(data).hexdigest()
+
+    def get_public_url(self, path):
+        return f'https://bench.supabase.co/storage/v1/object/public/exam-files/{path}'
+
+
+class StandInStorage:
+    def __init__(self, server):
+        self.session = httpx.Client(base_url='https://bench.supabase.co/storage/v1/',
+                                    transport=StreamingTransport(server.handle))
+        self.bucket = StandInBucket(server)
+
+    def from_(self, name):
+        return self.bucket
+
+
+class StandInTable:
+    def insert(self, data):
+        return self
+
+    def execute(self):
+        return None
+
+
+class StandInSupabase:
+    def __init__(self, server):
+        self.storage = StandInStorage(server)
+
+    def table(self, name):
+        return StandInTable()
+
+
+def init_data(user_id):
+    import hmac
+    params = {'auth_date': str(int(time.time())), 'user': json.dumps({'id': user_id})}
+    check = "\n".join(f"{k}={v}" for k, v in sorted(params.items()))
+    secret = hashlib.sha256(BOT_TOKEN.encode()).digest()
+    params['hash'] = hmac.new(secret, check.encode(), hashlib.sha256).hexdigest()
+    return urlencode(params)
+
+
+def run(sizes, fail_every):
+    client = backend.app.test_client()
+    headers = {'X-Telegram-Init-Data': init_data(42)}
+    print(f"chunk {uploads.CHUNK_SIZE // MB} MiB; a chunk drops half-way every {fail_every} PATCHes")
+    print(f"{'size MiB':>9} {'status':>7} {'peak MiB':>9} {'PATCHes':>8} {'s':>6} {'hash ok':>8}")
+    for size in sizes:
+        server = TusServer(fail_every)
+        backend.supabase = StandInSupabase(server)
+        body = SyntheticPDF(size * MB)
+        query = urlencode({'filename': f'scan{size}.pdf', 'university': 'AAU', 'year': '2024', 'subject': 'Physics'})
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        response = client.put(f'/upload/stream?{query}', input_stream=body, headers=headers,
+                              content_length=body.size, content_type='application/pdf')
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        stored = [u['digest'].hexdigest() for u in server.uploads.values()] + list(server.simple.values())
+        print(f"{size:>9} {response.status_code:>7} {peak / MB:>9.1f} {server.patches:>8} "
+              f"{elapsed:>6.2f} {str(stored == [body.digest.hexdigest()]):>8}")
+        assert response.status_code == 200, response.get_json()
+        assert stored == [body.digest.hexdigest()]
+        assert peak <= PEAK_BUDGET, f'{size} MiB upload peaked at {peak / MB:.1f} MiB'
+
+    # Validation from the first bytes and the declared length
+    backend.supabase = StandInSupabase(TusServer())
+    for name, data in (('fake.pdf', b'\x89PNG\r\n\x1a\n' + b'0' * 100), ('photo.png', b'%PDF-1.4' + b'0' * 100)):
+        response = client.put(f"/upload/stream?{urlencode({'filename': name, 'university': 'AAU', 'year': '2024', 'subject': 'X'})}",
+                              data=data, headers=headers)
+        print(f"{name}: {response.status_code} {response.get_json()['error']}")
+        assert response.status_code == 400
+    big = SyntheticPDF(uploads.MAX_UPLOAD_SIZE + 1)
+    response = client.put(f"/upload/stream?{urlencode({'filename': 'big.pdf', 'university': 'AAU', 'year': '2024', 'subject': 'X'})}",
+                          input_stream=big, content_length=big.size, headers=headers)
+    print(f"over limit: {response.status_code}, {big.position} bytes read")
+    assert response.status_code == 413 and big.position == 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[4, 16, 128, 512], help='file sizes in MiB')
+    parser.add_argument('--fail-every', type=int, default=7)
+    args = parser.parse_args()
+    if max(args.sizes) * MB > uploads.MAX_UPLOAD_SIZE:
+        parser.error(f'sizes above MAX_UPLOAD_MB ({uploads.MAX_UPLOAD_SIZE // MB}) are refused with 413')
+    run(args.sizes, args.fail_every)
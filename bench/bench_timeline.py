@@ -0,0 +1,96 @@
+"""
+Benchmark: fan-out-on-write timelines.
+
+Read side: GET /api/exams?feed_type=following for a user following 10,
+1,000 and 10,000 accounts, served by the following_exams join versus the
+precomputed timeline.
+
+Write side: POST /api/exams by an author with N followers in fanout mode
+(pushed to every follower) and hybrid mode (authors above the celebrity
+threshold are merged in at read time instead).
+
+Usage: python bench/bench_timeline.py [--follows 10 1000 10000] [--redis]
+"""
+
+import argparse
+import time
+
+from common import FakeSupabase, init_data, install_functions, load_api, seed
+from fake_redis import FakeRedis
+from _timeline import MemoryTimelineStore, RedisTimelineStore, Timeline
+
+
+def make_store(redis):
+    return RedisTimelineStore(FakeRedis()) if redis else MemoryTimelineStore()
+
+
+def build(users, latency):
+    fake = FakeSupabase(latency=latency)
+    rows = seed(fake, users=users + 1, exams=max(200, users), follows_per_user=0)
+    install_functions(fake)
+    return fake, rows
+
+
+def timed(call):
+    start = time.perf_counter()
+    response = call()
+    assert response.status_code == 200, response.get_json()
+    return response, (time.perf_counter() - start) * 1000
+
+
+def bench_reads(follow_counts, latency, redis):
+    print(f"{'follows':>8} {'path':>9} {'queries':>8} {'ms':>8} {'exams':>6}")
+    for follows in follow_counts:
+        fake, users = build(follows, latency)
+        reader = users[0]
+        fake.seed('follows', [{'follower_id': reader['id'], 'following_id': u['id'], 'created_at': u['created_at']}
+                              for u in users[1:]])
+        api = load_api(fake)
+        api.timeline = Timeline(make_store(redis), mode='fanout')
+        api.timeline.rebuild(api.fetch_all)
+        client = api.app.test_client()
+        headers = {'X-Telegram-Auth': init_data(reader['telegram_id'])}
+        client.get('/api/exams?limit=1', headers=headers)  # warm the auth cache
+
+        for mode in ('off', 'fanout'):
+            api.timeline.mode = mode
+            fake.reset_counters()
+            response, elapsed = timed(lambda: client.get('/api/exams?feed_type=following&limit=20', headers=headers))
+            path = 'join' if mode == 'off' else 'timeline'
+            print(f"{follows:>8} {path:>9} {fake.query_count:>8} {elapsed:>8.1f} "
+                  f"{len(response.get_json()['exams']):>6}")
+
+
+def bench_writes(follower_counts, latency, redis):
+    print(f"\n{'followers':>9} {'mode':>7} {'queries':>8} {'ms':>8} {'pushed':>7}")
+    for followers in follower_counts:
+        fake, users = build(followers, latency)
+        author = users[0]
+        fake.seed('follows', [{'follower_id': u['id'], 'following_id': author['id'], 'created_at': u['created_at']}
+                              for u in users[1:]])
+        author['followers_count'] = followers
+        api = load_api(fake)
+        client = api.app.test_client()
+        headers = {'X-Telegram-Auth': init_data(author['telegram_id'])}
+        client.get('/api/exams?limit=1', headers=headers)
+        payload = {'university_id': fake.tables['universities'][0]['id'],
+                   'course_id': fake.tables['courses'][0]['id'],
+                   'year': 2024, 'exam_type': 'Final', 'files': ['https://cdn.local/p0.jpg']}
+
+        for mode in ('fanout', 'hybrid'):
+            store = make_store(redis)
+            api.timeline = Timeline(store, mode=mode, celebrity_threshold=1000)
+            fake.reset_counters()
+            _, elapsed = timed(lambda: client.post('/api/exams', json=payload, headers=headers))
+            pushed = sum(1 for u in users[1:] if store.page(u['id'], None, 1))
+            print(f"{followers:>9} {mode:>7} {fake.query_count:>8} {elapsed:>8.1f} {pushed:>7}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--follows', type=int, nargs='+', default=[10, 1000, 10000])
+    parser.add_argument('--latency', type=float, default=0.005, help='simulated seconds per round trip')
+    parser.add_argument('--redis', action='store_true', help='use the Redis timeline store (in-memory stand-in)')
+    args = parser.parse_args()
+    bench_reads(args.follows, args.latency, args.redis)
+    bench_writes(args.follows, args.latency, args.redis)
@@ -0,0 +1,112 @@
+"""
+Benchmark: API requests, storage round trips and server time to upload a
+multi-page exam one page at a time (/api/upload/url and /api/upload/confirm
+per page) and with the batch endpoints (/api/upload/urls and
+/api/upload/confirms).
+
+The client's own cost is estimated as API requests made in sequence times
+--client-rtt-ms (a phone on a mobile network); the transfers to storage are
+the same either way and are not counted. Pages are synthetic phone photos
+and the API runs with its default configuration, so /api/upload/confirm
+renders each page inline while the batch confirm leaves rendering to
+process-uploads, timed separately.
+
+Usage: python bench/bench_upload_batch.py [--pages 5 30] [--width 1600] [--latency-ms 20] [--client-rtt-ms 150]
+"""
+
+import argparse
+import hashlib
+import time
+
+from bench_media import phone_photo
+from common import FakeSupabase, init_data, install_functions, load_api, seed
+
+
+def scans(count, width):
+    """Distinct page contents, plus one page repeated (a re-photographed page)"""
+    pages = [phone_photo(width, i) for i in range(count - 1)]
+    return pages + [pages[0]]
+
+
+def per_page(client, headers, fake, pages):
+    requests = 0
+    results = []
+    for data in pages:
+        body = {'filename': 'page.pdf', 'content_type': 'application/pdf', 'sha256': hashlib.sha256(data).hexdigest()}
+        upload = client.post('/api/upload/url', json=body, headers=headers).get_json()
+        requests += 1
+        if not upload['exists']:
+            fake.objects[('exams', upload['path'])] = data
+            upload = client.post('/api/upload/confirm', json={'path': upload['path']}, headers=headers).get_json()
+            requests += 1
+        results.append(upload['url'])
+    return results, requests
+
+
+def batched(client, headers, fake, pages):
+    files = [{'filename': 'page.pdf', 'content_type': 'application/pdf', 'sha256': hashlib.sha256(data).hexdigest()}
+             for data in pages]
+    response = client.post('/api/upload/urls', json={'files': files}, headers=headers).get_json()
+    assert not response['failed'], response
+    uploads = response['results']
+    pending = {}
+    for upload, data in zip(uploads, pages):
+        if not upload['exists'] and upload['path'] not in pending:
+            fake.objects[('exams', upload['path'])] = data
+            pending[upload['path']] = None
+    requests = 1
+    if pending:
+        response = client.post('/api/upload/confirms', json={'paths': list(pending)}, headers=headers).get_json()
+        assert not response['failed'], response
+        pending = dict(zip(pending, response['results']))
+        # Rendering is deferred to process-uploads
+        assert not any(result.get('thumbnail_url') for result in pending.values()), pending
+        requests += 1
+    return [upload['url'] if upload['exists'] else pending[upload['path']]['url'] for upload in uploads], requests
+
+
+def run(page_counts, width, latency_ms, client_rtt_ms):
+    fake = FakeSupabase()
+    users = seed(fake, users=2, exams=0)
+    install_functions(fake)
+    api = load_api(fake)
+    assert api.PROCESS_UPLOADS
+    client = api.app.test_client()
+    headers = {'X-Telegram-Auth': init_data(users[0]['telegram_id'])}
+    client.get('/api/user/profile', headers=headers)
+    fake.latency = latency_ms / 1000
+
+    print(f"{latency_ms:.0f} ms per Supabase round trip, {client_rtt_ms:.0f} ms per client request")
+    print(f"{'pages':>6} {'flow':<9} {'requests':>9} {'supabase':>9} {'server ms':>10} {'est. client ms':>15}")
+    for count in page_counts:
+        pages = scans(count, width)
+        urls = {}
+        for name, flow in (('per-page', per_page), ('batch', batched)):
+            # Fresh content each run so neither flow finds the other's files
+            pages = [data + name.encode() for data in pages]
+            fake.reset_counters()
+            start = time.perf_counter()
+            urls[name], requests = flow(client, headers, fake, pages)
+            seconds = time.perf_counter() - start
+            assert len(set(urls[name])) == count - 1
+            print(f"{count:>6} {name:<9} {requests:>9} {fake.query_count:>9} {seconds * 1000:>10.0f} "
+                  f"{seconds * 1000 + requests * client_rtt_ms:>15.0f}")
+
+        # The batch's files get their derived sizes from process-uploads
+        start = time.perf_counter()
+        done = api.process_uploads()
+        seconds = time.perf_counter() - start
+        assert done['files'] == count - 1, done
+        unrendered = [blob for blob in fake.tables['file_blobs'] if not blob.get('thumbnail_url')]
+        assert not unrendered, unrendered
+        print(f"{count:>6} {'process':<9} {'':>9} {'':>9} {seconds * 1000:>10.0f}   ({done['files']} files rendered off-request)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, nargs='+', default=[5, 30])
+    parser.add_argument('--width', type=int, default=1600, help='photo width in pixels')
+    parser.add_argument('--latency-ms', type=float, default=20)
+    parser.add_argument('--client-rtt-ms', type=float, default=150)
+    args = parser.parse_args()
+    run(args.pages, args.width, args.latency_ms, args.client_rtt_ms)
@@ -0,0 +1,426 @@
+"""
+Shared helpers for the benchmark scripts: loading api/index.py against the
+in-memory Supabase stand-in, signing Telegram initData and seeding data.
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import random
+import re
+import sys
+import uuid
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'api'))
+sys.path.insert(0, os.path.join(ROOT, 'bench'))
+
+from _ranking import event_exponent, log_add, trending_score  # noqa: E402
+from fake_supabase import FakeSupabase  # noqa: E402
+
+BOT_TOKEN = 'bench:token'
+
+# Half-life used by trending_exponent() in DEPLOYMENT.md
+TRENDING_HALF_LIFE_HOURS = 48
+
+# Key columns of the exam_facets rollup
+FACET_COLUMNS = ('university_id', 'course_id', 'year', 'exam_type')
+
+
+def _adjust(fake, table, row_id, column, delta):
+    for _, row in fake._index(table, 'id').get(str(row_id), ()):
+        row[column] = max((row.get(column) or 0) + delta, 0)
+    fake.touch(table, column)
+
+
+def _bump_facet(fake, exam, delta):
+    key = {column: exam.get(column) for column in FACET_COLUMNS}
+    for facet in fake.tables['exam_facets']:
+        if all(facet.get(column) == value for column, value in key.items()):
+            facet['exam_count'] = max(facet['exam_count'] + delta, 0)
+            fake.touch('exam_facets', 'exam_count')
+            return
+    fake._append('exam_facets', dict(key, exam_count=max(delta, 0)))
+
+
+def _exam_trending_score(fake, exam):
+    likes = [like['created_at'] for _, like in fake._index('exam_likes', 'exam_id').get(str(exam['id']), ())]
+    return trending_score(exam['created_at'], likes, TRENDING_HALF_LIFE_HOURS)
+
+
+def count_facets(fake):
+    """Visible exams per facet combination, as rebuild_exam_facets() counts them"""
+    counts = {}
+    for exam in fake.tables['exams']:
+        if not exam.get('is_hidden'):
+            key = tuple(exam.get(column) for column in FACET_COLUMNS)
+            counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+def fill_facets(fake):
+    """Rebuild exam_facets for seeded exams, as rebuild-facets would"""
+    fake.tables['exam_facets'] = [dict(zip(FACET_COLUMNS, key), exam_count=n) for key, n in count_facets(fake).items()]
+    fake.touch('exam_facets')
+
+
+def rank_exams(fake):
+    """Fill trending_score for seeded exams, as recompute-trending would"""
+    for exam in fake.tables['exams']:
+        exam['trending_score'] = _exam_trending_score(fake, exam)
+    fake.touch('exams', 'trending_score')
+
+
+def install_triggers(fake):
+    """Mirror the counter, trending and facet triggers from DEPLOYMENT.md on the fake"""
+    def follows(client, op, row, old=None):
+        if op == 'UPDATE':
+            return
+        delta = 1 if op == 'INSERT' else -1
+        _adjust(client, 'users', row['follower_id'], 'following_count', delta)
+        _adjust(client, 'users', row['following_id'], 'followers_count', delta)
+
+    def exam_likes(client, op, row, old=None):
+        if op == 'UPDATE':
+            return
+        _adjust(client, 'exams', row['exam_id'], 'likes_count', 1 if op == 'INSERT' else -1)
+        for _, exam in client._index('exams', 'id').get(str(row['exam_id']), ()):
+            if op == 'INSERT':
+                exponent = event_exponent(row['created_at'], TRENDING_HALF_LIFE_HOURS)
+                exam['trending_score'] = log_add(exam.get('trending_score', exponent), exponent)
+            else:
+                exam['trending_score'] = _exam_trending_score(client, exam)
+        client.touch('exams', 'trending_score')
+
+    def exams(client, op, row, old=None):
+        if op == 'INSERT':
+            row['trending_score'] = event_exponent(row['created_at'], TRENDING_HALF_LIFE_HOURS)
+        # sync_exam_facets: only visible exams are counted
+        before = old if op == 'UPDATE' else row if op == 'DELETE' else None
+        after = row if op != 'DELETE' else None
+        if before and after and all(before.get(c) == after.get(c) for c in FACET_COLUMNS + ('is_hidden',)):
+            return
+        if before and not before.get('is_hidden'):
+            _bump_facet(client, before, -1)
+        if after and not after.get('is_hidden'):
+            _bump_facet(client, after, 1)
+
+    fake.triggers['follows'].append(follows)
+    fake.triggers['exam_likes'].append(exam_likes)
+    fake.triggers['exams'].append(exams)
+
+
+SEARCH_SOURCE_COLUMNS = ('course_id', 'university_id', 'user_id', 'teacher_name')
+
+
+def exam_search_document(client, exam):
+    """exam_search_text()'s document: course, username, university and teacher, lowercased"""
+    def name(table, row_id, column='name'):
+        rows = client._index(table, 'id').get(row_id, ())
+        return rows[0][1].get(column) if rows else None
+    parts = [name('courses', exam.get('course_id')), name('users', exam.get('user_id'), 'username'),
+             name('universities', exam.get('university_id')), exam.get('teacher_name')]
+    return ' '.join(p for p in parts if p).lower()
+
+
+def install_functions(fake):
+    """Register Python versions of the SQL functions from DEPLOYMENT.md"""
+    def create_exam_with_files(client, p_exam, p_files):
+        exam = dict(p_exam, is_hidden=False, likes_count=0,
+                    trending_score=event_exponent(p_exam['created_at'], TRENDING_HALF_LIFE_HOURS))
+        client.tables['exams'].append(exam)
+        client._fire('exams', 'INSERT', exam)
+        client.tables['exam_files'].extend(dict(f) for f in p_files)
+        return [dict(exam)]
+
+    def following_exams(client, p_follower_id):
+        followed = {f['following_id'] for _, f in client._index('follows', 'follower_id').get(str(p_follower_id), ())}
+        by_author = client._index('exams', 'user_id')
+        return [e for _, e in sorted(hit for user_id in followed for hit in by_author.get(user_id, ()))]
+
+    def recompute_trending_scores(client):
+        changed = 0
+        for exam in client.tables['exams']:
+            score = _exam_trending_score(client, exam)
+            if abs(exam.get('trending_score', 0) - score) > 1e-9:
+                exam['trending_score'] = score
+                changed += 1
+        client.touch('exams', 'trending_score')
+        return changed
+
+    def reconcile_counters(client):
+        followers, following, likes = {}, {}, {}
+        for f in client.tables['follows']:
+            followers[f['following_id']] = followers.get(f['following_id'], 0) + 1
+            following[f['follower_id']] = following.get(f['follower_id'], 0) + 1
+        for like in client.tables['exam_likes']:
+            likes[like['exam_id']] = likes.get(like['exam_id'], 0) + 1
+        fixed = {'users': 0, 'exams': 0}
+        for user in client.tables['users']:
+            expected = {'followers_count': followers.get(user['id'], 0), 'following_count': following.get(user['id'], 0)}
+            if any(user.get(k) != v for k, v in expected.items()):
+                user.update(expected)
+                fixed['users'] += 1
+        for exam in client.tables['exams']:
+            if exam.get('likes_count') != likes.get(exam['id'], 0):
+                exam['likes_count'] = likes.get(exam['id'], 0)
+                fixed['exams'] += 1
+        client.touch('users')
+        client.touch('exams', 'likes_count')
+        return [fixed]
+
+    def rebuild_exam_facets(client):
+        fill_facets(client)
+        return len(client.tables['exam_facets'])
+
+    def exam_facet_counts(client, p_university_id=None, p_course_id=None, p_year=None, p_exam_type=None,
+                          p_group_by=()):
+        filters = dict(zip(FACET_COLUMNS, (p_university_id, p_course_id, p_year, p_exam_type)))
+        counts = {}
+        for facet in client.tables['exam_facets']:
+            if facet['exam_count'] <= 0 or any(v is not None and facet[c] != v for c, v in filters.items()):
+                continue
+            keys = [(column,) + tuple(facet[c] if c == column else None for c in FACET_COLUMNS) for column in FACET_COLUMNS]
+            if p_group_by:
+                keys.append(('group',) + tuple(facet[c] if c in p_group_by else None for c in FACET_COLUMNS))
+            for key in keys:
+                counts[key] = counts.get(key, 0) + facet['exam_count']
+        return [dict(zip(('facet',) + FACET_COLUMNS, key), exam_count=n) for key, n in counts.items()]
+
+    def search_exams(client, q, p_university_id=None, p_course_id=None, p_year=None, p_user_id=None,
+                     p_follower_id=None, p_limit=20, p_offset=0):
+        # Same WHERE clause as the SQL, on exams.search_document only: the
+        # phrase as a substring, or every word as a whole token (the tsquery)
+        followed = None
+        if p_follower_id:
+            followed = {f['following_id'] for f in client.tables['follows'] if f['follower_id'] == p_follower_id}
+        needle, words = q.lower(), q.lower().split()
+        hits = []
+        for exam in client.tables['exams']:
+            if any(v is not None and str(exam.get(c)) != str(v) for c, v in (
+                    ('university_id', p_university_id), ('course_id', p_course_id),
+                    ('year', p_year), ('user_id', p_user_id))):
+                continue
+            if followed is not None and exam['user_id'] not in followed:
+                continue
+            document = exam.get('search_document', '')
+            tokens = set(re.findall(r'\w+', document))
+            phrase = needle in document
+            full = bool(words) and all(w in tokens for w in words)
+            if phrase or full:
+                hits.append((phrase + full, exam['created_at'], exam['id']))
+        hits.sort(reverse=True)
+        return [{'exam_id': exam_id, 'rank': float(rank)} for rank, _, exam_id in hits[p_offset:p_offset + p_limit]]
+
+    def sync_exam_search(client, op, row, old=None):
+        # exams_sync_search: BEFORE INSERT OR UPDATE OF the four source columns
+        if op != 'DELETE' and (old is None or any(old.get(c) != row.get(c) for c in SEARCH_SOURCE_COLUMNS)):
+            row['search_document'] = exam_search_document(client, row)
+
+    def sync_exam_search_names(client, op, row, old=None):
+        # users_sync_exam_search: a new username rewrites that user's exams
+        if op == 'UPDATE' and old.get('username') != row.get('username'):
+            for _, exam in client._index('exams', 'user_id').get(row['id'], ()):
+                exam['search_document'] = exam_search_document(client, exam)
+
+    # Exams that predate the trigger, like the backfill UPDATE in DEPLOYMENT.md
+    for exam in fake.tables['exams']:
+        exam['search_document'] = exam_search_document(fake, exam)
+
+    fake.functions['create_exam_with_files'] = create_exam_with_files
+    fake.functions['following_exams'] = following_exams
+    fake.functions['recompute_trending_scores'] = recompute_trending_scores
+    fake.functions['rebuild_exam_facets'] = rebuild_exam_facets
+    fake.functions['reconcile_counters'] = reconcile_counters
+    fake.functions['exam_facet_counts'] = exam_facet_counts
+    fake.functions['search_exams'] = search_exams
+    fake.triggers['exams'].append(sync_exam_search)
+    fake.triggers['users'].append(sync_exam_search_names)
+
+
+def load_api(fake):
+    """Import api/index.py and point it at the given fake client"""
+    os.environ.setdefault('BOT_TOKEN', BOT_TOKEN)
+    import index
+    index.BOT_TOKEN = BOT_TOKEN
+    index.supabase = fake
+    index.app.testing = True
+    index.auth_cache.clear()
+    index.search_backend.invalidate()
+    index.missing_rpcs.clear()
+    index.request_metrics.reset()
+    fake.observers.append(index.record_query)
+    fake.observers.append(lambda label, seconds: index.load_shedder.observe(seconds))
+    # Benchmarks drive a few users hard; bench_ratelimit.py turns limits back on
+    index.rate_limiter.limits = {}
+    index.load_shedder.budget = 0
+    return index
+
+
+def init_data(telegram_id, username=None):
+    """Build a correctly signed Telegram WebApp initData string"""
+    params = {
+        'auth_date': str(int(datetime.utcnow().timestamp())),
+        'query_id': uuid.uuid4().hex,
+        'user': json.dumps({'id': int(telegram_id), 'username': username or f'u{telegram_id}'}),
+    }
+    data_check_string = "\n".join(f"{k}={v}" for k, v in sorted(params.items()))
+    secret_key = hmac.new(b"WebAppData", BOT_TOKEN.encode(), hashlib.sha256).digest()
+    params['hash'] = hmac.new(secret_key, data_check_string.encode(), hashlib.sha256).hexdigest()
+    return urlencode(params)
+
+
+def seed(fake, users=50, exams=200, pages=3, likes_per_exam=5, follows_per_user=10):
+    """Populate the fake with a small but realistic data set"""
+    now = datetime.utcnow()
+    user_rows = [{'id': str(uuid.uuid4()), 'telegram_id': str(1000 + i), 'username': f'user{i}',
+                  'bio': '', 'avatar_url': '', 'created_at': now.isoformat()} for i in range(users)]
+    universities = [{'id': str(uuid.uuid4()), 'name': name} for name in
+                    ('Addis Ababa University', 'Bahir Dar University', 'Jimma University')]
+    courses = [{'id': str(uuid.uuid4()), 'name': name} for name in
+               ('Calculus I', 'Physics', 'Organic Chemistry', 'Data Structures', 'Economics')]
+    exam_rows, file_rows, like_rows, follow_rows = [], [], [], []
+    for i in range(exams):
+        exam = {
+            'id': str(uuid.uuid4()),
+            'user_id': user_rows[i % users]['id'],
+            'university_id': universities[i % len(universities)]['id'],
+            'course_id': courses[i % len(courses)]['id'],
+            'year': 2015 + i % 10,
+            'exam_type': ('Mid', 'Final', 'Quiz', 'Other')[i % 4],
+            'teacher_name': f'Teacher {i % 7}',
+            'is_hidden': False,
+            'created_at': (now - timedelta(minutes=i)).isoformat(),
+        }
+        exam_rows.append(exam)
+        for p in range(pages):
+            file_rows.append({'id': str(uuid.uuid4()), 'exam_id': exam['id'],
+                              'file_url': f'https://cdn.local/{exam["id"]}/{p}.jpg', 'page_order': p})
+        for j in range(likes_per_exam):
+            like_rows.append({'id': str(uuid.uuid4()), 'exam_id': exam['id'],
+                              'user_id': user_rows[(i + j) % users]['id'], 'created_at': now.isoformat()})
+    for i, user in enumerate(user_rows):
+        for j in range(1, follows_per_user + 1):
+            follow_rows.append({'follower_id': user['id'], 'following_id': user_rows[(i + j) % users]['id'],
+                                'created_at': now.isoformat()})
+    fake.seed('users', user_rows)
+    fake.seed('universities', universities)
+    fake.seed('courses', courses)
+    fake.seed('exams', exam_rows)
+    fake.seed('exam_files', file_rows)
+    fake.seed('exam_likes', like_rows)
+    fake.seed('follows', follow_rows)
+    for exam in exam_rows:
+        exam['likes_count'] = likes_per_exam
+    for user in user_rows:
+        user['followers_count'] = follows_per_user
+        user['following_count'] = follows_per_user
+    rank_exams(fake)
+    fill_facets(fake)
+    install_triggers(fake)
+    return user_rows
+
+
+# Data set sizes for seed_realistic(), roughly: a pilot, today, a year of growth
+SCALES = {
+    'small': {'users': 300, 'exams': 1500},
+    'medium': {'users': 2000, 'exams': 10000},
+    'large': {'users': 8000, 'exams': 40000},
+}
+
+UNIVERSITY_NAMES = ('Addis Ababa University', 'Bahir Dar University', 'Jimma University', 'Hawassa University',
+                    'Mekelle University', 'Gondar University', 'Haramaya University', 'Arba Minch University',
+                    'Adama Science and Technology University', 'Wollo University', 'Dire Dawa University',
+                    'Debre Markos University')
+
+COURSE_NAMES = ('Calculus I', 'Calculus II', 'Physics', 'General Chemistry', 'Organic Chemistry', 'Biology',
+                'Data Structures', 'Algorithms', 'Economics', 'Accounting', 'Statistics', 'Linear Algebra',
+                'Anatomy', 'Civic Education', 'English Communication', 'Logic', 'Psychology', 'Geography',
+                'Anthropology', 'Entrepreneurship', 'Emerging Technologies', 'Physical Fitness', 'History',
+                'Programming I', 'Programming II', 'Database Systems', 'Operating Systems', 'Networks',
+                'Thermodynamics', 'Circuit Analysis')
+
+
+def _zipf_weights(n, exponent=1.1):
+    return [1 / (rank + 1) ** exponent for rank in range(n)]
+
+
+def seed_realistic(fake, users=2000, exams=10000, rng_seed=0, max_pages=8, days=365):
+    """Populate the fake with skewed, production-like data and return the users.
+
+    Popularity follows a Zipf curve: a few users are followed by a large
+    share of the others and upload most exams; likes favour popular authors
+    and recent exams; exams have 1..max_pages pages and are spread over
+    `days`. Counter columns match the rows, as the triggers would keep them.
+    """
+    rng = random.Random(rng_seed)
+    now = datetime.utcnow()
+    user_rows = [{'id': str(uuid.UUID(int=rng.getrandbits(128))), 'telegram_id': str(100000 + i),
+                  'username': f'user{i}', 'bio': '', 'avatar_url': '', 'is_hidden': False,
+                  'followers_count': 0, 'following_count': 0,
+                  'created_at': (now - timedelta(days=rng.uniform(0, days))).isoformat()} for i in range(users)]
+    universities = [{'id': str(uuid.UUID(int=rng.getrandbits(128))), 'name': name} for name in UNIVERSITY_NAMES]
+    courses = [{'id': str(uuid.UUID(int=rng.getrandbits(128))), 'name': name} for name in COURSE_NAMES]
+    popularity = _zipf_weights(users)
+
+    follow_rows = []
+    for i, user in enumerate(user_rows):
+        # Most users follow a handful of accounts, some follow hundreds
+        wanted = min(users - 1, int(rng.lognormvariate(2.3, 1.0)))
+        followed = set()
+        while len(followed) < wanted:
+            followed.update(rng.choices(range(users), weights=popularity, k=wanted - len(followed)))
+            followed.discard(i)
+        for j in followed:
+            follow_rows.append({'follower_id': user['id'], 'following_id': user_rows[j]['id'],
+                                'created_at': now.isoformat()})
+            user['following_count'] += 1
+            user_rows[j]['followers_count'] += 1
+
+    exam_rows, file_rows, like_rows = [], [], []
+    authors = rng.choices(range(users), weights=popularity, k=exams)
+    ages = sorted(rng.expovariate(3 / days) for _ in range(exams))
+    for i in range(exams):
+        author = authors[i]
+        exam = {
+            'id': str(uuid.UUID(int=rng.getrandbits(128))),
+            'user_id': user_rows[author]['id'],
+            'university_id': rng.choices(universities, weights=_zipf_weights(len(universities), 0.8))[0]['id'],
+            'course_id': rng.choices(courses, weights=_zipf_weights(len(courses), 0.8))[0]['id'],
+            'year': rng.randint(2012, 2025),
+            'exam_type': rng.choices(('Mid', 'Final', 'Quiz', 'Other'), weights=(4, 4, 2, 1))[0],
+            'teacher_name': f'Teacher {rng.randint(0, users // 10)}',
+            'is_hidden': False,
+            'likes_count': 0,
+            'created_at': (now - timedelta(days=min(ages[i], days), seconds=i)).isoformat(),
+        }
+        exam_rows.append(exam)
+        for p in range(rng.randint(1, max_pages)):
+            file_rows.append({'id': str(uuid.UUID(int=rng.getrandbits(128))), 'exam_id': exam['id'],
+                              'file_url': f'https://cdn.local/{exam["id"]}/{p}.jpg',
+                              'thumbnail_url': f'https://cdn.local/{exam["id"]}/{p}.thumbnail.webp',
+                              'page_order': p})
+        # Recent exams by popular authors collect the most likes
+        expected = 40 * popularity[author] ** 0.5 / (1 + ages[i] / 30)
+        likers = {rng.randrange(users) for _ in range(min(users, int(rng.expovariate(1 / max(expected, 0.1)))))}
+        for j in likers:
+            # Spread over the exam's lifetime, deterministically so the rng stream is unchanged
+            liked_at = now - timedelta(days=min(ages[i], days) * ((j * 0.618) % 1))
+            like_rows.append({'id': str(uuid.UUID(int=rng.getrandbits(128))), 'exam_id': exam['id'],
+                              'user_id': user_rows[j]['id'], 'created_at': liked_at.isoformat()})
+        exam['likes_count'] = len(likers)
+
+    fake.seed('users', user_rows)
+    fake.seed('universities', universities)
+    fake.seed('courses', courses)
+    fake.seed('exams', exam_rows)
+    fake.seed('exam_files', file_rows)
+    fake.seed('exam_likes', like_rows)
+    fake.seed('follows', follow_rows)
+    rank_exams(fake)
+    fill_facets(fake)
+    install_triggers(fake)
+    return user_rows
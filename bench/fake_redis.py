@@ -0,0 +1,171 @@
+"""
+Minimal in-memory Redis stand-in (strings with expiry, sets, sorted sets,
+pipelines and registered scripts) for benchmarks.
+
+Lua can't run here, so eval() looks the script up in `scripts` and calls a
+Python equivalent with (redis, keys, args) under the store lock, which makes
+it atomic like the real thing.
+"""
+
+import threading
+import time
+
+
+class FakeRedis:
+    def __init__(self):
+        self._data = {}
+        self._expiry = {}
+        self._lock = threading.RLock()
+        self.commands = 0
+        self.scripts = {}
+
+    def _alive(self, key):
+        deadline = self._expiry.get(key)
+        if deadline is not None and deadline <= time.time():
+            self._data.pop(key, None)
+            self._expiry.pop(key, None)
+        return key in self._data
+
+    def get(self, key):
+        with self._lock:
+            self.commands += 1
+            return self._data[key] if self._alive(key) else None
+
+    def set(self, key, value, ex=None, nx=False):
+        with self._lock:
+            self.commands += 1
+            if nx and self._alive(key):
+                return None
+            self._data[key] = value if isinstance(value, bytes) else str(value).encode()
+            self._expiry.pop(key, None)
+            if ex:
+                self._expiry[key] = time.time() + ex
+            return True
+
+    def delete(self, *keys):
+        with self._lock:
+            self.commands += 1
+            removed = 0
+            for key in keys:
+                if self._alive(key):
+                    removed += 1
+                self._data.pop(key, None)
+                self._expiry.pop(key, None)
+            return removed
+
+    def incr(self, key, amount=1):
+        with self._lock:
+            self.commands += 1
+            value = int(self._data[key]) + amount if self._alive(key) else amount
+            self._data[key] = str(value).encode()
+            return value
+
+    def expire(self, key, seconds):
+        with self._lock:
+            self.commands += 1
+            if not self._alive(key):
+                return False
+            self._expiry[key] = time.time() + seconds
+            return True
+
+    # Sets
+
+    def sadd(self, key, *members):
+        with self._lock:
+            self.commands += 1
+            values = self._data.setdefault(key, set())
+            before = len(values)
+            values.update(m.encode() if isinstance(m, str) else m for m in members)
+            return len(values) - before
+
+    def srem(self, key, *members):
+        with self._lock:
+            self.commands += 1
+            values = self._data.get(key, set())
+            before = len(values)
+            values.difference_update(m.encode() if isinstance(m, str) else m for m in members)
+            return before - len(values)
+
+    def smembers(self, key):
+        with self._lock:
+            self.commands += 1
+            return set(self._data.get(key, set()))
+
+    # Sorted sets (ordered by score, then member)
+
+    def _ordered(self, key):
+        return sorted(self._data.get(key, {}).items(), key=lambda item: (item[1], item[0]))
+
+    def zadd(self, key, mapping):
+        with self._lock:
+            self.commands += 1
+            values = self._data.setdefault(key, {})
+            added = sum(1 for m in mapping if (m.encode() if isinstance(m, str) else m) not in values)
+            values.update({(m.encode() if isinstance(m, str) else m): float(s) for m, s in mapping.items()})
+            return added
+
+    def zscore(self, key, member):
+        with self._lock:
+            self.commands += 1
+            return self._data.get(key, {}).get(member.encode() if isinstance(member, str) else member)
+
+    def zrem(self, key, *members):
+        with self._lock:
+            self.commands += 1
+            values = self._data.get(key, {})
+            return sum(1 for m in members if values.pop(m.encode() if isinstance(m, str) else m, None) is not None)
+
+    def zrange(self, key, start, end, withscores=False):
+        with self._lock:
+            self.commands += 1
+            items = self._ordered(key)
+            items = items[start:len(items) + end + 1 if end < 0 else end + 1]
+            return items if withscores else [m for m, _ in items]
+
+    def zremrangebyrank(self, key, start, end):
+        with self._lock:
+            self.commands += 1
+            items = self._ordered(key)
+            doomed = items[start:len(items) + end + 1 if end < 0 else end + 1]
+            for member, _ in doomed:
+                del self._data[key][member]
+            return len(doomed)
+
+    def zrevrangebyscore(self, key, high, low, start=None, num=None, withscores=False):
+        with self._lock:
+            self.commands += 1
+            high, low = float(high), float(low)
+            items = [i for i in reversed(self._ordered(key)) if low <= i[1] <= high]
+            if start is not None:
+                items = items[start:start + num]
+            return items if withscores else [m for m, _ in items]
+
+    def eval(self, script, numkeys, *keys_and_args):
+        with self._lock:
+            self.commands += 1
+            return self.scripts[script](self, keys_and_args[:numkeys], keys_and_args[numkeys:])
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Queues commands and runs them in one round trip on execute()"""
+
+    def __init__(self, redis):
+        self._redis = redis
+        self._calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self._calls.append((name, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        with self._redis._lock:
+            commands = self._redis.commands
+            results = [getattr(self._redis, name)(*args, **kwargs) for name, args, kwargs in self._calls]
+            self._redis.commands = commands + 1
+        self._calls = []
+        return results
@@ -0,0 +1,564 @@
+"""
+In-memory stand-in for the Supabase client used by api/index.py.
+
+Implements the subset of the postgrest query builder the API uses
+(select/insert/update/delete, eq/in_/order/limit filters and embedded
+resources such as ``users!inner(*)``) and counts every round trip so
+benchmarks can report queries per request (and, with measure_bytes,
+the JSON bytes each would have returned) without a real project.
+Round trips sleep for a configurable, optionally per-action and jittered
+latency; eq/in_ lookups and full-table orderings are answered from
+cached indexes so the stand-in's own cost stays small at large scales.
+"""
+
+import copy
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+
+
+# Embedded resource name -> foreign key column on the parent row
+EMBED_KEYS = {
+    'users': 'user_id',
+    'universities': 'university_id',
+    'courses': 'course_id',
+}
+
+EMBED_RE = re.compile(r'(\w+)(!inner)?\(([^)]*)\)')
+
+
+class FakeResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class FakeQuery:
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.action = 'select'
+        self.columns = '*'
+        self.payload = None
+        self.filters = []
+        self.lookups = []       # (column, {values}) from eq/in_, answered from column indexes
+        self.orders = []
+        self.row_limit = None
+        self.row_offset = 0
+        self.count_method = None
+        self.on_conflict = None
+        self.ignore_duplicates = False
+
+    # ----- actions -----
+
+    def select(self, *columns, count=None):
+        self.action = 'select'
+        self.columns = ','.join(columns) if columns else '*'
+        self.count_method = count
+        return self
+
+    def insert(self, rows, **kwargs):
+        self.action = 'insert'
+        self.payload = rows
+        return self
+
+    def upsert(self, rows, on_conflict='', ignore_duplicates=False, **kwargs):
+        self.action = 'upsert'
+        self.payload = rows
+        self.on_conflict = on_conflict
+        self.ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, values, **kwargs):
+        self.action = 'update'
+        self.payload = values
+        return self
+
+    def delete(self, **kwargs):
+        self.action = 'delete'
+        return self
+
+    # ----- filters -----
+
+    def eq(self, column, value):
+        self.filters.append(lambda r: _str(r.get(column)) == _str(value))
+        self.lookups.append((column, {_str(value)}))
+        return self
+
+    def neq(self, column, value):
+        self.filters.append(lambda r: _str(r.get(column)) != _str(value))
+        return self
+
+    def in_(self, column, values):
+        wanted = {_str(v) for v in values}
+        self.filters.append(lambda r: _str(r.get(column)) in wanted)
+        self.lookups.append((column, wanted))
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda r: r.get(column) is not None and _cmp(r.get(column), value) > 0)
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda r: r.get(column) is not None and _cmp(r.get(column), value) >= 0)
+        return self
+
+    def lt(self, column, value):
+        self.filters.append(lambda r: r.get(column) is not None and _cmp(r.get(column), value) < 0)
+        return self
+
+    def lte(self, column, value):
+        self.filters.append(lambda r: r.get(column) is not None and _cmp(r.get(column), value) <= 0)
+        return self
+
+    def is_(self, column, value):
+        expected = None if value in (None, 'null') else value
+        self.filters.append(lambda r: r.get(column) is expected or _str(r.get(column)) == _str(expected))
+        return self
+
+    def ilike(self, column, pattern):
+        needle = pattern.strip('%').lower()
+        self.filters.append(lambda r: needle in str(r.get(column) or '').lower())
+        return self
+
+    def or_(self, filters, **kwargs):
+        self.filters.append(_logic('or', filters))
+        return self
+
+    def order(self, column, desc=False, **kwargs):
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, size, **kwargs):
+        self.row_limit = size
+        return self
+
+    def range(self, start, end, **kwargs):
+        self.row_offset = start
+        self.row_limit = end - start + 1
+        return self
+
+    # ----- execution -----
+
+    def execute(self):
+        return self.client._execute(self)
+
+
+class FakeAPIError(Exception):
+    """Mimics postgrest.APIError, which carries the PostgREST error code"""
+
+    def __init__(self, message, code):
+        super().__init__(message)
+        self.code = code
+
+
+class FakeRpc(FakeQuery):
+    """RPC call; set-returning results accept select/filters/order/limit like a table"""
+
+    def __init__(self, client, name, params):
+        super().__init__(client, None)
+        self.name = name
+        self.params = params or {}
+
+    def execute(self):
+        label = f'rpc:{self.name}'
+        self.client._round_trip(label)
+        fn = self.client.functions.get(self.name)
+        if fn is None:
+            raise FakeAPIError(f'Could not find the function public.{self.name}', 'PGRST202')
+        with self.client.lock:
+            data = fn(self.client, **self.params)
+            if isinstance(data, list):
+                return self.client._received(label, self.client._select_rows(self, data))
+            return self.client._received(label, FakeResponse(data))
+
+
+class FakeBucket:
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+
+    def create_signed_upload_url(self, path):
+        self.client._round_trip(f'storage:{self.name}')
+        token = uuid.uuid4().hex
+        return {
+            'signedURL': f'{self.client.url}/storage/v1/object/upload/sign/{self.name}/{path}?token={token}',
+            'token': token,
+        }
+
+    def get_public_url(self, path):
+        self.client._round_trip(f'storage:{self.name}')
+        return f'{self.client.url}/storage/v1/object/public/{self.name}/{path}'
+
+    def upload(self, path, file, file_options=None):
+        self.client._round_trip(f'storage:{self.name}')
+        data = file.read() if hasattr(file, 'read') else file
+        self.client.objects[(self.name, path)] = bytes(data)
+        return {'Key': f'{self.name}/{path}'}
+
+    def download(self, path):
+        self.client._round_trip(f'storage:{self.name}')
+        return self.client.objects[(self.name, path)]
+
+    def remove(self, paths):
+        self.client._round_trip(f'storage:{self.name}')
+        return [{'name': p} for p in paths if self.client.objects.pop((self.name, p), None) is not None]
+
+
+class FakeStorage:
+    def __init__(self, client):
+        self.client = client
+
+    def from_(self, bucket):
+        return FakeBucket(self.client, bucket)
+
+
+class TableCache:
+    """Column indexes and sort orders of one table's row list"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.key = (id(rows), len(rows))
+        self.next_position = len(rows)
+        self.indexes = {}
+        self.orders = {}
+
+    def index(self, column):
+        index = self.indexes.get(column)
+        if index is None:
+            index = defaultdict(list)
+            for position, row in enumerate(self.rows):
+                index[_str(row.get(column))].append((position, row))
+            self.indexes[column] = index
+        return index
+
+    def appended(self, rows, row):
+        self.rows = rows
+        self.key = (id(rows), len(rows))
+        for column, index in self.indexes.items():
+            index[_str(row.get(column))].append((self.next_position, row))
+        self.next_position += 1
+        self.orders.clear()
+
+    def removed(self, rows, doomed):
+        """`doomed` rows were deleted; `rows` is the new list"""
+        self.rows = rows
+        self.key = (id(rows), len(rows))
+        gone = {id(r) for r in doomed}
+        for column, index in self.indexes.items():
+            for value in {_str(r.get(column)) for r in doomed}:
+                index[value] = [hit for hit in index.get(value, ()) if id(hit[1]) not in gone]
+        for key, ordered in self.orders.items():
+            self.orders[key] = [r for r in ordered if id(r) not in gone]
+
+
+class FakeSupabase:
+    """Thread-safe in-memory Supabase client with simulated latency"""
+
+    url = 'http://fake-supabase.local'
+
+    def __init__(self, latency=0.0, jitter=0.0):
+        # Seconds per round trip: a number, or {'rpc': ..., 'storage': ..., '*': default}
+        # keyed by the label's action ('select', 'insert', 'upsert', 'rpc', 'storage', ...)
+        self.latency = latency
+        # Each round trip takes latency * (1 + uniform(0, jitter))
+        self.jitter = jitter
+        self.tables = defaultdict(list)
+        self.functions = {}
+        self.triggers = defaultdict(list)   # table -> [fn(client, op, row, old)], old set on UPDATE
+        self.objects = {}
+        self.query_count = 0
+        self.queries = Counter()
+        self.observers = []                 # fn(label, seconds) per round trip
+        self.measure_bytes = False          # count response JSON sizes into response_bytes
+        self.response_bytes = Counter()
+        self.indexes = {}                   # table -> TableCache
+        self.lock = threading.RLock()
+        self.storage = FakeStorage(self)
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def rpc(self, name, params=None):
+        return FakeRpc(self, name, params)
+
+    def seed(self, table, rows):
+        self.tables[table].extend(rows)
+
+    def reset_counters(self):
+        with self.lock:
+            self.query_count = 0
+            self.queries.clear()
+            self.response_bytes.clear()
+
+    def latency_for(self, label):
+        if not isinstance(self.latency, dict):
+            return self.latency
+        action = label.split(':', 1)[0]
+        return self.latency.get(action, self.latency.get('*', 0.0))
+
+    def _round_trip(self, label):
+        start = time.perf_counter()
+        with self.lock:
+            self.query_count += 1
+            self.queries[label] += 1
+        delay = self.latency_for(label)
+        if delay:
+            time.sleep(delay * (1 + random.uniform(0, self.jitter)) if self.jitter else delay)
+        for observer in self.observers:
+            observer(label, time.perf_counter() - start)
+
+    def _execute(self, q):
+        label = f'{q.action}:{q.table}'
+        self._round_trip(label)
+        with self.lock:
+            return self._received(label, getattr(self, f'_do_{q.action}')(q))
+
+    def _received(self, label, response):
+        if self.measure_bytes:
+            self.response_bytes[label] += len(json.dumps(response.data, default=str))
+        return response
+
+    def _fire(self, table, op, row, old=None):
+        for trigger in self.triggers[table]:
+            trigger(self, op, row, old)
+
+    def touch(self, table, column=None):
+        """Note that rows of `table` were changed in place (only `column`, if given)"""
+        cache = self._table_cache(table)
+        if column is None:
+            self.indexes.pop(table, None)
+            return
+        cache.indexes.pop(column, None)
+        for orders in [o for o in cache.orders if any(c == column for c, _ in o)]:
+            del cache.orders[orders]
+
+    def _table_cache(self, table):
+        """Derived data (column indexes, sort orders) for a table.
+
+        Writes through this client keep it up to date; appends and
+        reassignments made by other code are noticed through the list's
+        identity and length and drop it. Filters are still applied to index
+        candidates, so an index can only be too wide; rows edited in place by
+        other code must be reported with touch().
+        """
+        rows = self.tables[table]
+        cache = self.indexes.get(table)
+        if cache is None or cache.key != (id(rows), len(rows)):
+            cache = TableCache(rows)
+            self.indexes[table] = cache
+        return cache
+
+    def _append(self, table, row):
+        rows = self.tables[table]
+        cache = self._table_cache(table)
+        rows.append(row)
+        cache.appended(rows, row)
+
+    def _remove(self, table, doomed):
+        cache = self._table_cache(table)
+        gone = {id(r) for r in doomed}
+        rows = [r for r in self.tables[table] if id(r) not in gone]
+        self.tables[table] = rows
+        cache.removed(rows, doomed)
+
+    def _index(self, table, column):
+        """{value: [(position, row)]} for a column; positions only grow, in table order"""
+        return self._table_cache(table).index(column)
+
+    def _sorted(self, table, orders):
+        """The whole table in the given order"""
+        cache = self._table_cache(table)
+        key = tuple(orders)
+        rows = cache.orders.get(key)
+        if rows is None:
+            rows = _order(self.tables[table], orders)
+            cache.orders[key] = rows
+        return rows
+
+    def _candidates(self, q):
+        """Rows that can match q's eq/in_ filters, in table order"""
+        if not q.lookups:
+            return self.tables[q.table]
+        column, values = min(q.lookups, key=lambda lookup: len(lookup[1]))
+        index = self._index(q.table, column)
+        hits = [hit for value in values for hit in index.get(value, ())]
+        if len(values) > 1:
+            hits.sort(key=lambda hit: hit[0])
+        return [row for _, row in hits]
+
+    def _match(self, q):
+        return [r for r in self._candidates(q) if all(f(r) for f in q.filters)]
+
+    def _do_select(self, q):
+        if q.orders and not q.lookups:
+            # Sorting the whole table is cached; filters then run lazily up to the limit
+            return self._select_rows(q, self._sorted(q.table, q.orders), ordered=True)
+        return self._select_rows(q, self._candidates(q))
+
+    def _select_rows(self, q, rows, ordered=False):
+        rows = (r for r in rows if all(f(r) for f in q.filters))
+        if not ordered:
+            rows = _order(list(rows), q.orders)
+        # Project (and apply !inner joins) lazily so only the returned page is copied
+        lookup = {}
+        projected = (self._project(q.table, r, q.columns, lookup) for r in rows)
+        projected = [r for r in projected if r is not None] if q.count_method or q.row_limit is None else projected
+        if isinstance(projected, list):
+            count = len(projected) if q.count_method else None
+            end = None if q.row_limit is None else q.row_offset + q.row_limit
+            return FakeResponse(projected[q.row_offset:end], count)
+        page = []
+        for row in projected:
+            if row is None:
+                continue
+            page.append(row)
+            if len(page) >= q.row_offset + q.row_limit:
+                break
+        return FakeResponse(page[q.row_offset:])
+
+    def _do_insert(self, q):
+        rows = q.payload if isinstance(q.payload, list) else [q.payload]
+        inserted, appended = [], []
+        try:
+            for row in rows:
+                row = dict(row)
+                row.setdefault('id', str(uuid.uuid4()))
+                self._append(q.table, row)
+                appended.append(row)
+                self._fire(q.table, 'INSERT', row)
+                inserted.append(copy.deepcopy(row))
+        except Exception:
+            # One statement: a failing row takes the rest of the batch with it
+            self._remove(q.table, appended)
+            raise
+        return FakeResponse(inserted)
+
+    def _do_upsert(self, q):
+        rows = q.payload if isinstance(q.payload, list) else [q.payload]
+        keys = [k.strip() for k in (q.on_conflict or 'id').split(',')]
+        written = []
+        for row in rows:
+            candidates = self._index(q.table, keys[0]).get(_str(row.get(keys[0])), ())
+            existing = next((r for _, r in candidates
+                             if all(_str(r.get(k)) == _str(row.get(k)) for k in keys)), None)
+            if existing is None:
+                row = dict(row)
+                self._append(q.table, row)
+                self._fire(q.table, 'INSERT', row)
+                written.append(copy.deepcopy(row))
+            elif not q.ignore_duplicates:
+                old = dict(existing)
+                existing.update(row)
+                for column in row:
+                    self.touch(q.table, column)
+                self._fire(q.table, 'UPDATE', existing, old)
+                written.append(copy.deepcopy(existing))
+        return FakeResponse(written)
+
+    def _do_update(self, q):
+        rows = self._match(q)
+        for r in rows:
+            old = dict(r)
+            r.update(q.payload)
+            self._fire(q.table, 'UPDATE', r, old)
+        for column in q.payload:
+            self.touch(q.table, column)
+        return FakeResponse(copy.deepcopy(rows))
+
+    def _do_delete(self, q):
+        rows = self._match(q)
+        self._remove(q.table, rows)
+        for row in rows:
+            self._fire(q.table, 'DELETE', row)
+        return FakeResponse(copy.deepcopy(rows))
+
+    def _project(self, table, row, columns, lookup):
+        embeds = EMBED_RE.findall(columns)
+        plain = [c.strip() for c in EMBED_RE.sub('', columns).split(',') if c.strip()]
+        if '*' in plain or not plain:
+            out = copy.deepcopy(row)
+        else:
+            out = {c: copy.deepcopy(row.get(c)) for c in plain}
+        for name, inner, sub_columns in embeds:
+            if name not in lookup:
+                lookup[name] = {_str(r.get('id')): r for r in self.tables[name]}
+            key = EMBED_KEYS.get(name)
+            target = lookup[name].get(_str(row.get(key))) if key else None
+            if target is None and inner:
+                return None
+            out[name] = self._project(name, target, sub_columns or '*', lookup) if target else None
+        return out
+
+
+OPERATORS = {
+    'eq': lambda a, b: _str(a) == _str(b),
+    'neq': lambda a, b: _str(a) != _str(b),
+    'lt': lambda a, b: a is not None and _cmp(a, b) < 0,
+    'lte': lambda a, b: a is not None and _cmp(a, b) <= 0,
+    'gt': lambda a, b: a is not None and _cmp(a, b) > 0,
+    'gte': lambda a, b: a is not None and _cmp(a, b) >= 0,
+    'ilike': lambda a, b: b.strip('%*').lower() in str(a or '').lower(),
+    'in': lambda a, b: _str(a) in {v.strip().strip('"') for v in b.strip('()').split(',')},
+}
+
+
+def _split_top_level(expr):
+    """Split a PostgREST logic tree on commas outside parentheses and quotes"""
+    parts, depth, quoted, current = [], 0, False, ''
+    for ch in expr:
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == '(':
+            depth += 1
+        elif not quoted and ch == ')':
+            depth -= 1
+        if ch == ',' and depth == 0 and not quoted:
+            parts.append(current)
+            current = ''
+        else:
+            current += ch
+    parts.append(current)
+    return [p for p in parts if p]
+
+
+def _logic(kind, expr):
+    """Compile an or=(...) / and(...) filter string into a row predicate"""
+    predicates = []
+    for part in _split_top_level(expr):
+        if part.startswith(('and(', 'or(')):
+            name, _, inner = part.partition('(')
+            predicates.append(_logic(name, inner[:-1]))
+            continue
+        column, op, value = part.split('.', 2)
+        value = value[1:-1] if value.startswith('"') and value.endswith('"') else value
+        test = OPERATORS[op]
+        predicates.append(lambda r, c=column, t=test, v=value: t(r.get(c), v))
+    combine = any if kind == 'or' else all
+    return lambda r: combine(p(r) for p in predicates)
+
+
+def _str(value):
+    return None if value is None else str(value)
+
+
+def _cmp(a, b):
+    if isinstance(a, (int, float)) and not isinstance(b, (int, float)):
+        b = type(a)(b)
+    a, b = (a, b) if type(a) is type(b) else (str(a), str(b))
+    return (a > b) - (a < b)
+
+
+def _order(rows, orders):
+    rows = list(rows)
+    for column, desc in reversed(orders):
+        rows.sort(key=lambda r: _sort_key(r.get(column)), reverse=desc)
+    return rows
+
+
+def _sort_key(value):
+    return (value is None, value if value is not None else 0)
@@ -0,0 +1,273 @@
+"""
+Load test: api/index.py under concurrent traffic against the in-memory
+Supabase stand-in, with realistic data and per-round-trip latency.
+
+Scenarios exercise the hot handlers one at a time (feed, following feed,
+trending/top feeds, search, profile views, like storms on a few hot exams, exam creation) or
+as a weighted mix. For each one the report gives throughput, p50/p95/p99
+latency and Supabase queries per request (read from the Server-Timing
+header). Results can be saved as JSON and compared with a saved baseline;
+the script exits non-zero when queries per request grow or p95 regresses
+by more than the tolerance, so it can gate a deploy:
+
+    python bench/load.py --scale small --save bench/baseline.json
+    python bench/load.py --scale small --baseline bench/baseline.json
+
+Usage: python bench/load.py [--scenarios feed search ...] [--scale small|medium|large]
+       [--concurrency 8] [--requests 400] [--latency-ms 8] [--jitter 0.5]
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+
+from common import SCALES, FakeSupabase, init_data, install_functions, load_api, seed_realistic
+
+QUERIES_RE = re.compile(r'db;dur=[\d.]+;desc="(\d+) queries"')
+
+# Weights of the "mixed" scenario, roughly today's traffic
+MIX = {'feed': 40, 'following': 20, 'profile': 15, 'like_storm': 12, 'search': 10, 'create_exam': 3}
+
+HOT_EXAMS = 5
+
+
+class Context:
+    """Seeded data and per-user credentials shared by the scenario functions"""
+
+    def __init__(self, fake, users):
+        self.fake = fake
+        self.users = users
+        self.weights = [1 / (rank + 1) ** 1.1 for rank in range(len(users))]
+        self.exams = sorted(fake.tables['exams'], key=lambda e: e['likes_count'], reverse=True)
+        self.universities = [u['id'] for u in fake.tables['universities']]
+        self.courses = [c['id'] for c in fake.tables['courses']]
+        self.terms = [c['name'].split()[0] for c in fake.tables['courses']] + \
+                     [f"Teacher {i}" for i in range(10)]
+        self._headers = {}
+        self._lock = threading.Lock()
+
+    def headers(self, user):
+        with self._lock:
+            if user['id'] not in self._headers:
+                self._headers[user['id']] = {'X-Telegram-Auth': init_data(user['telegram_id'])}
+            return self._headers[user['id']]
+
+    def reader(self, rng):
+        return rng.choice(self.users)
+
+    def popular(self, rng):
+        return rng.choices(self.users, weights=self.weights)[0]
+
+
+def feed(ctx, rng):
+    params = 'limit=20&view=card'
+    if rng.random() < 0.3:
+        params += f'&university_id={rng.choice(ctx.universities)}'
+    return 'GET', f'/api/exams?{params}', None, ctx.reader(rng)
+
+
+def following(ctx, rng):
+    return 'GET', '/api/exams?limit=20&feed_type=following&view=card', None, ctx.reader(rng)
+
+
+def ranked(ctx, rng):
+    sort = rng.choice(('trending', 'top'))
+    return 'GET', f'/api/exams?limit=20&view=card&sort={sort}', None, ctx.reader(rng)
+
+
+def search(ctx, rng):
+    return 'GET', f'/api/exams?limit=20&view=card&search={rng.choice(ctx.terms)}', None, ctx.reader(rng)
+
+
+def profile(ctx, rng):
+    return 'GET', f"/api/user/profile/{ctx.popular(rng)['id']}", None, ctx.reader(rng)
+
+
+def like_storm(ctx, rng):
+    exam = rng.choice(ctx.exams[:HOT_EXAMS])
+    method = 'POST' if rng.random() < 0.7 else 'DELETE'
+    return method, f"/api/exams/{exam['id']}/like", None, ctx.reader(rng)
+
+
+def create_exam(ctx, rng):
+    exam_id = uuid.uuid4()
+    pages = [{'file_url': f'https://cdn.local/new/{exam_id}/{p}.jpg',
+              'thumbnail_url': f'https://cdn.local/new/{exam_id}/{p}.thumbnail.webp'}
+             for p in range(rng.randint(1, 8))]
+    return 'POST', '/api/exams', {
+        'university_id': rng.choice(ctx.universities),
+        'course_id': rng.choice(ctx.courses),
+        'year': rng.randint(2012, 2025),
+        'exam_type': rng.choice(('Mid', 'Final', 'Quiz')),
+        'teacher_name': f'Teacher {rng.randint(0, 50)}',
+        'files': pages,
+    }, ctx.popular(rng)
+
+
+def mixed(ctx, rng):
+    name = rng.choices(list(MIX), weights=list(MIX.values()))[0]
+    return SCENARIOS[name](ctx, rng)
+
+
+SCENARIOS = {
+    'feed': feed,
+    'following': following,
+    'ranked': ranked,
+    'search': search,
+    'profile': profile,
+    'like_storm': like_storm,
+    'create_exam': create_exam,
+    'mixed': mixed,
+}
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def run_scenario(api, ctx, scenario, requests, concurrency, rng_seed):
+    """Issue `requests` calls from `concurrency` threads; return the summary"""
+    make = SCENARIOS[scenario]
+    remaining = [requests]
+    lock = threading.Lock()
+    samples = []
+
+    def worker(index):
+        client = api.app.test_client()
+        rng = random.Random(f'{rng_seed}:{scenario}:{index}')
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            method, path, body, user = make(ctx, rng)
+            start = time.perf_counter()
+            response = client.open(path, method=method, json=body, headers=ctx.headers(user))
+            elapsed = time.perf_counter() - start
+            match = QUERIES_RE.search(response.headers.get('Server-Timing', ''))
+            with lock:
+                samples.append((elapsed, response.status_code, int(match.group(1)) if match else 0))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    latencies = [s[0] * 1000 for s in samples]
+    queries = [s[2] for s in samples]
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for s in samples if s[1] >= 500),
+        'rejected': sum(1 for s in samples if 400 <= s[1] < 500),
+        'throughput': round(len(samples) / wall, 1),
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'queries_per_request': round(sum(queries) / max(1, len(queries)), 2),
+        'max_queries': max(queries, default=0),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Regression messages for results that are worse than the baseline"""
+    problems = []
+    for scenario, result in results.items():
+        before = baseline.get('results', {}).get(scenario)
+        if not before:
+            continue
+        if result['queries_per_request'] > before['queries_per_request'] + 0.05:
+            problems.append(f"{scenario}: queries/request {before['queries_per_request']} -> "
+                            f"{result['queries_per_request']}")
+        if result['p95_ms'] > before['p95_ms'] * (1 + tolerance):
+            problems.append(f"{scenario}: p95 {before['p95_ms']} ms -> {result['p95_ms']} ms "
+                            f"(over {tolerance:.0%} tolerance)")
+        if result['errors'] > before['errors']:
+            problems.append(f"{scenario}: {result['errors']} server errors (baseline {before['errors']})")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS),
+                        default=['feed', 'following', 'ranked', 'search', 'profile', 'like_storm', 'create_exam',
+                                 'mixed'])
+    parser.add_argument('--scale', choices=list(SCALES), default='small')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=400, help='requests per scenario')
+    parser.add_argument('--warmup', type=int, default=20, help='untimed requests per scenario')
+    parser.add_argument('--latency-ms', type=float, default=8, help='simulated Supabase round trip')
+    parser.add_argument('--storage-latency-ms', type=float, default=None, help='defaults to --latency-ms')
+    parser.add_argument('--jitter', type=float, default=0.5, help='extra latency, as a fraction, drawn uniformly')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save', help='write results as JSON to this path')
+    parser.add_argument('--baseline', help='compare with results saved by --save')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed p95 regression')
+    args = parser.parse_args()
+
+    fake = FakeSupabase()
+    start = time.perf_counter()
+    users = seed_realistic(fake, rng_seed=args.seed, **SCALES[args.scale])
+    install_functions(fake)
+    api = load_api(fake)
+    api.SERVER_TIMING = True
+    api.SLOW_REQUEST_MS = 0
+    ctx = Context(fake, users)
+
+    # Validate every user's initData and resolve their users.id once, so
+    # queries per request count the handlers and not auth-cache misses
+    # (bench_auth.py covers those)
+    api.auth_cache.maxsize = max(api.auth_cache.maxsize, len(users))
+    warm = api.app.test_client()
+    for user in users:
+        warm.get('/api/exams?limit=1&feed_type=following', headers=ctx.headers(user))
+    print(f"scale {args.scale}: {len(users)} users, {len(fake.tables['exams'])} exams, "
+          f"{len(fake.tables['follows'])} follows, {len(fake.tables['exam_likes'])} likes "
+          f"(seeded in {time.perf_counter() - start:.1f} s)")
+    print(f"{args.concurrency} threads, {args.requests} requests per scenario, "
+          f"{args.latency_ms} ms (+{args.jitter:.0%}) per round trip\n")
+
+    latency = args.latency_ms / 1000
+    storage = latency if args.storage_latency_ms is None else args.storage_latency_ms / 1000
+    results = {}
+    print(f"{'scenario':<12} {'reqs':>5} {'err':>4} {'4xx':>4} {'req/s':>7} {'p50 ms':>7} {'p95 ms':>7} "
+          f"{'p99 ms':>7} {'q/req':>6} {'max q':>6}")
+    for scenario in args.scenarios:
+        fake.latency, fake.jitter = 0.0, 0.0
+        run_scenario(api, ctx, scenario, args.warmup, args.concurrency, f'warmup:{args.seed}')
+        fake.latency, fake.jitter = {'*': latency, 'storage': storage}, args.jitter
+        result = run_scenario(api, ctx, scenario, args.requests, args.concurrency, args.seed)
+        results[scenario] = result
+        print(f"{scenario:<12} {result['requests']:>5} {result['errors']:>4} {result['rejected']:>4} "
+              f"{result['throughput']:>7.1f} {result['p50_ms']:>7.1f} {result['p95_ms']:>7.1f} "
+              f"{result['p99_ms']:>7.1f} {result['queries_per_request']:>6.2f} {result['max_queries']:>6}")
+
+    report = {'config': {k: v for k, v in vars(args).items() if k not in ('save', 'baseline')},
+              'results': results}
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nsaved {args.save}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('config', {}).get('scale') != args.scale:
+            print(f"\nwarning: baseline was recorded at scale {baseline.get('config', {}).get('scale')}")
+        problems = compare(results, baseline, args.tolerance)
+        print('\n' + ('\n'.join(f"REGRESSION {p}" for p in problems) if problems else 'no regressions against baseline'))
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
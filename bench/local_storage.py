@@ -0,0 +1,72 @@
+"""
+Filesystem stand-in for Supabase Storage: buckets are directories under a
+root, public URLs use the same /storage/v1/object/public/ layout so the
+API can map them back to object paths.
+"""
+
+import os
+import uuid
+
+
+class LocalBucket:
+    def __init__(self, storage, name):
+        self.storage = storage
+        self.name = name
+
+    def _file(self, path):
+        full = os.path.normpath(os.path.join(self.storage.root, self.name, path))
+        if not full.startswith(os.path.join(self.storage.root, self.name)):
+            raise ValueError(f'Path escapes bucket: {path}')
+        return full
+
+    def create_signed_upload_url(self, path):
+        token = uuid.uuid4().hex
+        return {
+            'signedURL': f'{self.storage.url}/storage/v1/object/upload/sign/{self.name}/{path}?token={token}',
+            'token': token,
+        }
+
+    def get_public_url(self, path):
+        return f'{self.storage.url}/storage/v1/object/public/{self.name}/{path}'
+
+    def upload(self, path, file, file_options=None):
+        full = self._file(path)
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        with open(full, 'wb') as out:
+            if hasattr(file, 'read'):
+                for chunk in iter(lambda: file.read(1 << 16), b''):
+                    out.write(chunk)
+            else:
+                out.write(file)
+        self.storage.writes += 1
+        return {'Key': f'{self.name}/{path}'}
+
+    def download(self, path):
+        with open(self._file(path), 'rb') as f:
+            return f.read()
+
+    def remove(self, paths):
+        removed = []
+        for path in paths:
+            if os.path.exists(self._file(path)):
+                os.remove(self._file(path))
+                removed.append({'name': path})
+        return removed
+
+    def size(self, path):
+        return os.path.getsize(self._file(path))
+
+
+class LocalStorage:
+    def __init__(self, root, url='http://storage.local'):
+        self.root = root
+        self.url = url
+        self.writes = 0
+
+    def from_(self, name):
+        return LocalBucket(self, name)
+
+    def size_of(self, public_url):
+        """Bytes behind a public URL produced by this storage"""
+        bucket, path = public_url.split('/storage/v1/object/public/', 1)[1].split('/', 1)
+        return self.from_(bucket).size(path)